@@ -1,6 +1,16 @@
-import json
-from typing import Dict, List
+import argparse
 import os
+import sys
+import requests
+from datetime import datetime
+from typing import Dict, List, Optional
+from calculator_core import Printer as CorePrinter, QuoteInput, quote
+from export import QUOTE_FIELDS, detect_format, export_rows
+from job_history import JobHistoryImporter, make_source, quote_records
+from power_log import PowerStore
+from profiling import add_profile_arguments, start_profiler
+from scheduler import COST_SLACK, iter_jobs, load_jobs, schedule_jobs
+from settings import Settings
 
 class Printer:
     def __init__(self, name: str, power_consumption: float, default_speed: float):
@@ -11,19 +21,21 @@ class Printer:
 class PrintCalculator:
     def __init__(self):
         self.printers: Dict[str, Printer] = {}
+        self.settings = Settings()
+        self.power_store = PowerStore()
         self.load_printers()
 
     def load_printers(self):
-        """Load printers from JSON file if exists, otherwise create default printers"""
-        if os.path.exists('printers.json'):
-            with open('printers.json', 'r') as f:
-                printer_data = json.load(f)
-                for name, data in printer_data.items():
-                    self.printers[name] = Printer(
-                        name=name,
-                        power_consumption=data['power_consumption'],
-                        default_speed=data['default_speed']
-                    )
+        """Load printers from the shared settings if present, otherwise create default printers"""
+        printer_data = self.settings.get('printers')
+        if printer_data is not None:
+            # printers.json is shared with the GUI and stores watts
+            for data in printer_data:
+                self.printers[data['name']] = Printer(
+                    name=data['name'],
+                    power_consumption=data['power_consumption'] / 1000,
+                    default_speed=data.get('default_speed', 50)
+                )
         else:
             # Default printers
             self.printers = {
@@ -35,16 +47,18 @@ class PrintCalculator:
             self.save_printers()
 
     def save_printers(self):
-        """Save printers to JSON file"""
-        printer_data = {
-            name: {
-                'power_consumption': printer.power_consumption,
+        """Save printers to the shared settings, keeping fields only the GUI uses"""
+        existing = {data['name']: data for data in self.settings.get('printers') or []}
+        printer_data = []
+        for name, printer in self.printers.items():
+            data = dict(existing.get(name, {}))
+            data.update({
+                'name': name,
+                'power_consumption': printer.power_consumption * 1000,
                 'default_speed': printer.default_speed
-            }
-            for name, printer in self.printers.items()
-        }
-        with open('printers.json', 'w') as f:
-            json.dump(printer_data, f, indent=4)
+            })
+            printer_data.append(data)
+        self.settings.set('printers', printer_data)
 
     def add_printer(self, name: str, power_consumption: float, default_speed: float):
         """Add a new printer to the system"""
@@ -52,30 +66,40 @@ class PrintCalculator:
         self.save_printers()
 
     def calculate_costs(self, printer_name: str, print_time: float, filament_weight: float,
-                       power_cost: float, filament_cost: float, profit_margin: float) -> Dict[str, float]:
-        """Calculate all costs for a print job"""
+                       power_cost: float, filament_cost: float, profit_margin: float,
+                       measured_kwh: Optional[float] = None) -> Dict[str, float]:
+        """Calculate all costs for a print job, optionally with the energy measured by a power log"""
         printer = self.printers[printer_name]
-        
-        # Calculate power costs
-        power_costs = printer.power_consumption * print_time * power_cost
-        
-        # Calculate filament costs (convert kg price to g price)
-        filament_costs = (filament_weight * filament_cost) / 1000
-        
-        # Calculate total costs
-        total_costs = power_costs + filament_costs
-        
-        # Calculate final price with profit margin
-        final_price = total_costs * (1 + profit_margin / 100)
+        result = quote(QuoteInput(
+            print_time=print_time,
+            filament_weight=filament_weight,
+            power_consumption=printer.power_consumption * 1000,
+            power_price=power_cost,
+            filament_price=filament_cost,
+            profit_margin=profit_margin,
+            printer=printer_name,
+            measured_kwh=measured_kwh
+        ))
         
         return {
-            'power_costs': round(power_costs, 2),
-            'filament_costs': round(filament_costs, 2),
-            'total_costs': round(total_costs, 2),
-            'final_price': round(final_price, 2)
+            'power_costs': round(result.power_costs, 2),
+            'filament_costs': round(result.filament_costs, 2),
+            'total_costs': round(result.total_costs, 2),
+            'final_price': round(result.final_price, 2)
         }
 
 def main():
+    parser = argparse.ArgumentParser(description="3D Druck Kostenrechner (Kommandozeile)")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    
+    profiler = start_profiler(args)
+    if profiler:
+        module = sys.modules[__name__]
+        profiler.patch(PrintCalculator, 'calculate_costs')
+        profiler.patch(module, 'schedule_jobs')
+        profiler.patch(module, 'export_rows')
+    
     calculator = PrintCalculator()
     
     while True:
@@ -83,9 +107,12 @@ def main():
         print("\n1. Druckkosten berechnen")
         print("2. Neuen Drucker hinzufügen")
         print("3. Verfügbare Drucker anzeigen")
-        print("4. Beenden")
+        print("4. Druckaufträge auf Drucker verteilen")
+        print("5. Aufträge kalkulieren und exportieren")
+        print("6. Druckhistorie importieren (OctoPrint/Moonraker)")
+        print("7. Beenden")
         
-        choice = input("\nWählen Sie eine Option (1-4): ")
+        choice = input("\nWählen Sie eine Option (1-7): ")
         
         if choice == "1":
             # Show available printers
@@ -104,10 +131,24 @@ def main():
             filament_cost = float(input("Filamentkosten pro kg (in €): "))
             profit_margin = float(input("Gewinnmarge (in %): "))
             
+            # Use the smart-plug log for the job window if there is one
+            measured_kwh = None
+            if calculator.power_store.has_log(printer_name):
+                start_text = input("Druckstart für gemessenen Verbrauch (JJJJ-MM-TT HH:MM, leer = Schätzung): ").strip()
+                if start_text:
+                    reading = calculator.power_store.measured_energy(
+                        printer_name, datetime.fromisoformat(start_text), print_time)
+                    if reading:
+                        measured_kwh = reading.window_kwh
+                        print(f"Gemessen: {measured_kwh:.3f} kWh (Ø {reading.mean_watts:.0f} W, "
+                              f"{reading.coverage:.0%} abgedeckt)")
+                    else:
+                        print("Stromlog deckt den Zeitraum nicht ab, verwende Schätzung.")
+            
             # Calculate and display results
             results = calculator.calculate_costs(
                 printer_name, print_time, filament_weight,
-                power_cost, filament_cost, profit_margin
+                power_cost, filament_cost, profit_margin, measured_kwh
             )
             
             print("\n=== Kostenübersicht ===")
@@ -132,11 +173,135 @@ def main():
                 print(f"Standardgeschwindigkeit: {printer.default_speed} mm/s")
                 
         elif choice == "4":
+            jobs_file = input("\nCSV-Datei mit Aufträgen (name, print_time, filament_weight): ")
+            objective = input("Ziel - (k)osten oder (d)urchlaufzeit minimieren: ").strip().lower()
+            slack = COST_SLACK
+            if objective.startswith('k'):
+                # Ohne Spielraum bleibt der ausgeglichene Plan unverändert
+                slack_text = input(f"Wie viel länger darf der Plan dauern? (in %, Standard {COST_SLACK:.0%}): ").strip()
+                if slack_text:
+                    slack = float(slack_text.rstrip('%')) / 100
+            power_cost = float(input("Stromkosten pro kWh (in €): "))
+            
+            jobs = load_jobs(jobs_file)
+            printers = {name: printer.power_consumption * 1000
+                        for name, printer in calculator.printers.items()}
+            schedule = schedule_jobs(jobs, printers, power_cost,
+                                     objective='cost' if objective.startswith('k') else 'makespan',
+                                     slack=slack)
+            
+            print("\n=== Druckplan ===")
+            for name, slots in schedule.timelines.items():
+                print(f"\nDrucker: {name}")
+                for slot in slots:
+                    print(f"  {slot.start:8.2f}h - {slot.end:8.2f}h  {slot.job.name}  ({slot.power_costs:.2f}€)")
+            print(f"\nGesamtdauer: {schedule.makespan:.2f}h")
+            print(f"Stromverbrauch: {schedule.total_kwh:.2f} kWh")
+            print(f"Stromkosten: {schedule.total_costs:.2f}€")
+            
+        elif choice == "5":
+            jobs_file = input("\nCSV-Datei mit Aufträgen (name, print_time, filament_weight): ")
+            output_file = input("Exportdatei (.csv, .json, .jsonl oder .html): ")
+            
+            print("\nVerfügbare Drucker:")
+            for i, printer in enumerate(calculator.printers.keys(), 1):
+                print(f"{i}. {printer}")
+            printer_index = int(input("\nWählen Sie einen Drucker (Nummer): ")) - 1
+            printer_name = list(calculator.printers.keys())[printer_index]
+            
+            power_cost = float(input("Stromkosten pro kWh (in €): "))
+            filament_cost = float(input("Filamentkosten pro kg (in €): "))
+            profit_margin = float(input("Gewinnmarge (in %): "))
+            
+            # Rows are generated while writing, so large job lists are never held in memory
+            def quote_rows():
+                for job in iter_jobs(jobs_file):
+                    row = calculator.calculate_costs(
+                        printer_name, job.print_time, job.filament_weight,
+                        power_cost, filament_cost, profit_margin
+                    )
+                    row.update(name=job.name, printer=printer_name, print_time=job.print_time,
+                               filament_weight=job.filament_weight)
+                    yield row
+            
+            try:
+                count = export_rows(quote_rows(), output_file,
+                                    fields=['name', 'printer', 'print_time', 'filament_weight',
+                                            'power_costs', 'filament_costs', 'total_costs', 'final_price'])
+                print(f"\n{count} Aufträge nach {output_file} exportiert.")
+            except (OSError, ValueError, KeyError) as e:
+                print(f"\nFehler beim Export: {e}")
+            
+        elif choice == "6":
+            kind = input("\nDruckserver - (o)ctoprint oder (m)oonraker: ").strip().lower()
+            url = input("Adresse (z.B. http://192.168.1.20): ").strip()
+            api_key = input("API-Schlüssel (leer lassen, falls nicht nötig): ").strip()
+            full = input("Gesamte Historie neu laden? (j/n): ").strip().lower().startswith('j')
+            
+            print("\nVerfügbare Drucker:")
+            for i, printer in enumerate(calculator.printers.keys(), 1):
+                print(f"{i}. {printer}")
+            printer_index = int(input("\nWählen Sie einen Drucker (Nummer): ")) - 1
+            printer_name = list(calculator.printers.keys())[printer_index]
+            power_cost = float(input("Stromkosten pro kWh (in €): "))
+            filament_cost = float(input("Filamentkosten pro kg (in €): "))
+            profit_margin = float(input("Gewinnmarge (in %): "))
+            output_file = input("Exportdatei (.csv, .json, .jsonl oder .html, leer für keine): ").strip()
+            
+            # Exportziel vor dem Abruf prüfen, damit keine Aufträge verloren gehen
+            if output_file:
+                try:
+                    detect_format(output_file)
+                except ValueError as e:
+                    print(f"\n{e}")
+                    continue
+                output_dir = os.path.dirname(os.path.abspath(output_file))
+                if not os.path.isdir(output_dir) or not os.access(output_dir, os.W_OK):
+                    print(f"\nOrdner nicht beschreibbar: {output_dir}")
+                    continue
+            
+            # Gemessene Werte statt Slicer-Schätzung in die Kostenrechnung geben
+            printer = CorePrinter(printer_name, calculator.printers[printer_name].power_consumption * 1000)
+            try:
+                source = make_source('octoprint' if kind.startswith('o') else 'moonraker', url, api_key)
+                with JobHistoryImporter(calculator.settings) as importer:
+                    records = importer.sync(source, full=full)
+            except (requests.RequestException, ValueError, KeyError) as e:
+                print(f"\nFehler beim Abruf der Druckhistorie: {e}")
+                continue
+            
+            rows = list(quote_records(records, printer, power_cost, filament_cost, profit_margin))
+            print(f"\n=== {len(rows)} neue Druckaufträge ===")
+            for row in rows:
+                print(f"{row['name']}: {row['print_time']:.2f}h, {row['filament_weight']:.1f}g, "
+                      f"{row['total_costs']:.2f}€ (Endpreis {row['final_price']:.2f}€)")
+            if rows:
+                print(f"\nGesamtkosten: {sum(row['total_costs'] for row in rows):.2f}€")
+            if not rows:
+                continue
+            
+            # Den Sync-Stand erst nach erfolgreichem Export bzw. nach Bestätigung weitersetzen
+            if output_file:
+                try:
+                    count = export_rows(rows, output_file, fields=QUOTE_FIELDS)
+                    print(f"{count} Aufträge nach {output_file} exportiert.")
+                except (OSError, ValueError, KeyError) as e:
+                    print(f"\nFehler beim Export: {e}")
+                    print("Die Aufträge werden beim nächsten Abruf erneut geladen.")
+                    continue
+            elif not input("Aufträge als importiert markieren? (j/n): ").strip().lower().startswith('j'):
+                continue
+            importer.commit(source, records)
+            
+        elif choice == "7":
             print("\nProgramm wird beendet. Auf Wiedersehen!")
             break
         
         else:
-            print("\nUngültige Eingabe. Bitte wählen Sie eine Option zwischen 1 und 4.")
+            print("\nUngültige Eingabe. Bitte wählen Sie eine Option zwischen 1 und 7.")
+    
+    if profiler:
+        print(profiler.finish())
 
 if __name__ == "__main__":
     main()
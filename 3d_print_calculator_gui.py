@@ -1,6 +1,5 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import json
 import os
 from typing import Dict
 import glob
@@ -10,24 +9,21 @@ import sys
 import shutil
 import requests
 import webbrowser
-
-class Printer:
-    def __init__(self, name, power_consumption):
-        self.name = name
-        self.power_consumption = power_consumption
-
-    def to_dict(self):
-        return {
-            "name": self.name,
-            "power_consumption": self.power_consumption
-        }
-
-    @classmethod
-    def from_dict(cls, data):
-        return cls(
-            name=data["name"],
-            power_consumption=data["power_consumption"]
-        )
+import argparse
+import base64
+from datetime import datetime
+from tariff import load_tariff, default_tariff_path
+from gcode_phases import PowerProfile
+from gcode_stats import LARGE_GCODE_SIZE
+from calculator_core import Printer, QuoteInput, find_latest_gcode, power_model, quote, read_batch, scan_file
+from settings import Settings
+from export import QUOTE_FIELDS, export_rows
+from thumbnails import ThumbnailCache
+from power_log import PowerStore
+from profiling import add_profile_arguments, start_profiler
+from printer_io import (export_printers, import_printers, merge_printers, printer_display,
+                        write_error_report)
+from sweep import monte_carlo, grid_sweep, percentile_table, format_table, spread
 
 class PrintCalculatorGUI:
     def __init__(self, root):
@@ -61,10 +57,23 @@ class PrintCalculatorGUI:
         # Initialisiere Variablen
         self.printer_var = tk.StringVar()
         self.printers = []
+        # Direkte Zuordnung Anzeige-Text -> Drucker und Name -> Drucker
+        self.printer_index = {}
+        self.printers_by_name = {}
         self.orca_path = tk.StringVar()
         self.cost_entries = {}
         self.result_labels = {}
         self.config = {}
+        self.settings = Settings()
+        self.tariff = None
+        self.gcode_scan = None
+        self.gcode_scan_inputs = None  # Druckzeit/Gewicht, zu denen gcode_scan gehört
+        self.invalid_start_text = None  # zuletzt gemeldeter ungültiger Druckstart
+        self.batch_metadata = []
+        self.last_quote = None
+        self.thumbnails = ThumbnailCache()
+        self.power_store = PowerStore()
+        self.preview_image = None  # Referenz halten, sonst verschwindet das Bild
         
         # Erstelle das Notebook für Tabs
         self.notebook = ttk.Notebook(self.root)
@@ -72,15 +81,20 @@ class PrintCalculatorGUI:
         
         # Lade Konfiguration und Drucker
         self.load_config()
+        self.load_tariff()
         self.load_printers()
         
         # Erstelle die Tabs
         self.create_main_tab()
+        self.create_analysis_tab()
         self.create_settings_tab()
         
         # Erstelle Footer
         self.create_footer()
         
+        # Änderungen anderer Instanzen übernehmen, sobald das Fenster aktiv wird
+        self.root.bind('<FocusIn>', self.reload_changed_settings)
+        
     def setup_styles(self):
         style = ttk.Style()
         style.theme_use('clam')
@@ -213,7 +227,7 @@ class PrintCalculatorGUI:
         
         ttk.Button(combo_frame,
                   text="Einstellungen",
-                  command=lambda: self.notebook.select(1),
+                  command=lambda: self.notebook.select(2),
                   style='Custom.TButton').pack(side='right', padx=(10, 0))
         
         # DATEN IMPORTIEREN
@@ -232,11 +246,22 @@ class PrintCalculatorGUI:
                   command=self.import_from_orca,
                   style='Custom.TButton').pack(fill='x')
         
+        ttk.Button(import_content,
+                  text="Mehrere Dateien importieren",
+                  command=self.import_gcode_batch,
+                  style='Custom.TButton').pack(fill='x', pady=(5, 0))
+        
         self.orca_status = ttk.Label(import_content,
                                    text="",
                                    style='Card.TLabel')
         self.orca_status.pack(pady=(10, 0))
         
+        # Vorschau: Dateiliste nur bei mehreren Dateien, Bild erst beim Anzeigen dekodiert
+        self.preview_list = tk.Listbox(import_content, height=4, activestyle='none', exportselection=False)
+        self.preview_list.bind('<<ListboxSelect>>', self.on_preview_select)
+        self.preview_label = ttk.Label(import_content, text="", style='Card.TLabel')
+        self.preview_label.pack(pady=(10, 0))
+        
         # KOSTEN EINGEBEN
         ttk.Label(left_column,
                  text="KOSTEN EINGEBEN",
@@ -252,6 +277,7 @@ class PrintCalculatorGUI:
             ("Druckzeit (h)", "0"),
             ("Filament Gewicht (g)", "0"),
             ("Strompreis (€/kWh)", "0.40"),
+            ("Druckstart (JJJJ-MM-TT HH:MM)", ""),
             ("Filament Preis (€/kg)", "20"),
             ("Stückzahl", "1"),
             ("Gewinnmarge (%)", "20")  # Neue Gewinnmarge
@@ -280,6 +306,11 @@ class PrintCalculatorGUI:
                   command=self.calculate_costs,
                   style='Custom.TButton').pack(fill='x')
         
+        ttk.Button(button_frame,
+                  text="Exportieren",
+                  command=self.export_quotes,
+                  style='Custom.TButton').pack(fill='x', pady=(5, 0))
+        
         # Rechte Spalte
         right_column = ttk.Frame(content, style='Main.TFrame')
         right_column.pack(side='left', fill='both', expand=True)
@@ -301,7 +332,8 @@ class PrintCalculatorGUI:
             ("Filamentkosten", ""),
             ("Gesamtkosten", ""),
             ("Kosten pro Stück", ""),
-            ("Endrechnung", "")  # Neue Ergebnisanzeige
+            ("Endrechnung", ""),  # Neue Ergebnisanzeige
+            ("Günstigster Start", "")
         ]
         
         for text, _ in results:
@@ -318,6 +350,71 @@ class PrintCalculatorGUI:
             result.pack(side='right')
             self.result_labels[text] = result
 
+    def create_analysis_tab(self):
+        analysis_tab = ttk.Frame(self.notebook, style='Main.TFrame')
+        self.notebook.add(analysis_tab, text='Preisanalyse')
+
+        container = ttk.Frame(analysis_tab, style='Main.TFrame')
+        container.pack(fill='both', expand=True, padx=20, pady=20)
+
+        ttk.Label(container,
+                 text="UNSICHERHEITEN",
+                 style='Section.TLabel').pack(anchor='w', pady=(0, 10))
+
+        input_card = ttk.Frame(container, style='Card.TFrame')
+        input_card.pack(fill='x', pady=(0, 20))
+
+        input_frame = ttk.Frame(input_card, style='Card.TFrame')
+        input_frame.pack(fill='x', padx=10, pady=10)
+
+        fields = [
+            ("Ausfallrate (%)", "5"),
+            ("Schwankung Strompreis (%)", "10"),
+            ("Schwankung Filamentpreis (%)", "10"),
+            ("Spanne Gewinnmarge (±%)", "10"),
+            ("Stichproben", "1000000"),
+            ("Rasterschritte", "50")
+        ]
+
+        self.analysis_entries = {}
+        for i, (text, default) in enumerate(fields):
+            frame = ttk.Frame(input_frame, style='Card.TFrame')
+            frame.pack(fill='x', pady=(0, 5) if i < len(fields)-1 else 0)
+
+            ttk.Label(frame,
+                     text=text,
+                     style='Card.TLabel').pack(side='left')
+
+            entry = ttk.Entry(frame, width=15, justify='right')
+            entry.pack(side='right')
+            entry.insert(0, default)
+            self.analysis_entries[text] = entry
+
+        button_frame = ttk.Frame(input_card, style='Card.TFrame')
+        button_frame.pack(fill='x', padx=10, pady=(0, 10))
+
+        ttk.Button(button_frame,
+                  text="Monte Carlo",
+                  command=lambda: self.run_price_analysis('monte_carlo'),
+                  style='Custom.TButton').pack(side='left', fill='x', expand=True, padx=(0, 5))
+
+        ttk.Button(button_frame,
+                  text="Raster",
+                  command=lambda: self.run_price_analysis('grid'),
+                  style='Custom.TButton').pack(side='left', fill='x', expand=True, padx=(5, 0))
+
+        ttk.Label(container,
+                 text="PREISVERTEILUNG",
+                 style='Section.TLabel').pack(anchor='w', pady=(0, 10))
+
+        self.analysis_output = tk.Text(container,
+                                       height=6,
+                                       bg=self.colors['card'],
+                                       fg=self.colors['text'],
+                                       font=('Consolas', 10),
+                                       relief='flat')
+        self.analysis_output.pack(fill='x')
+
     def create_settings_tab(self):
         settings_frame = ttk.Frame(self.notebook)
         self.notebook.add(settings_frame, text="Einstellungen")
@@ -333,7 +430,7 @@ class PrintCalculatorGUI:
 
         ttk.Label(path_frame, text="Installationspfad:").pack(side='left')
         
-        self.orca_path = tk.StringVar(value=self.config.get('orca_path', ''))
+        self.orca_path = tk.StringVar(value=self.settings.orca_path)
         path_entry = ttk.Entry(path_frame, textvariable=self.orca_path)
         path_entry.pack(side='left', fill='x', expand=True, padx=5)
         
@@ -342,6 +439,27 @@ class PrintCalculatorGUI:
                   style='Custom.TButton',
                   command=self.browse_orca_path).pack(side='left')
 
+        # Stromtarif Einstellungen
+        tariff_settings = ttk.LabelFrame(settings_frame,
+                                       text="Stromtarif",
+                                       style='Card.TLabelframe')
+        tariff_settings.pack(fill='x', padx=10, pady=10)
+
+        tariff_frame = ttk.Frame(tariff_settings, style='Card.TFrame')
+        tariff_frame.pack(fill='x', padx=10, pady=5)
+
+        ttk.Label(tariff_frame, text="Tarifdatei (CSV/JSON):").pack(side='left')
+
+        self.tariff_path = tk.StringVar(value=self.config.get('tariff_file', ''))
+        tariff_entry = ttk.Entry(tariff_frame, textvariable=self.tariff_path)
+        tariff_entry.pack(side='left', fill='x', expand=True, padx=5)
+        tariff_entry.bind('<FocusOut>', lambda e: self.sync_tariff_path())
+
+        ttk.Button(tariff_frame,
+                  text="Durchsuchen",
+                  style='Custom.TButton',
+                  command=self.browse_tariff_file).pack(side='left')
+
         # Update Einstellungen
         update_settings = ttk.LabelFrame(settings_frame,
                                        text="Updates",
@@ -401,15 +519,29 @@ class PrintCalculatorGUI:
                   style='Custom.TButton',
                   command=self.remove_printer).pack(side='left', padx=5)
 
+        ttk.Button(button_frame,
+                  text="Importieren",
+                  style='Custom.TButton',
+                  command=self.import_printer_file).pack(side='left', padx=5)
+
+        ttk.Button(button_frame,
+                  text="Exportieren",
+                  style='Custom.TButton',
+                  command=self.export_printer_file).pack(side='left', padx=5)
+
+        ttk.Button(button_frame,
+                  text="Stromlog importieren",
+                  style='Custom.TButton',
+                  command=self.import_power_log).pack(side='left', padx=5)
+
         # Initialisiere die Drucker-Liste
         self.update_printer_lists()
 
     def load_printers(self):
-        try:
-            with open('printers.json', 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                self.printers = [Printer.from_dict(p) for p in data]
-        except FileNotFoundError:
+        data = self.settings.get('printers')
+        if data is not None:
+            self.printers = [Printer.from_dict(p) for p in data]
+        else:
             # Erstelle Standard-Drucker
             self.printers = [
                 Printer("Ender 3 V2", 150),
@@ -420,35 +552,55 @@ class PrintCalculatorGUI:
         self.update_printer_lists()
 
     def save_printers(self):
-        data = [p.to_dict() for p in self.printers]
-        with open('printers.json', 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4)
+        self.settings.set('printers', [p.to_dict() for p in self.printers])
+
+    def reload_changed_settings(self, event=None):
+        """Lädt Drucker und Konfiguration neu, wenn eine andere Instanz sie geändert hat"""
+        if event is not None and event.widget is not self.root:
+            return
+        if self.settings.changed('printers'):
+            self.load_printers()
+        if self.settings.changed('config') or self.settings.changed('ini'):
+            self.load_config()
+            self.load_tariff()
 
     def get_printer_list(self):
         """Gibt eine Liste der Drucker im Format 'Name (Stromverbrauch W)' zurück"""
-        return [f"{printer.name} ({printer.power_consumption} W)" for printer in self.printers]
+        return list(self.printer_index)
 
     def get_printer_by_name(self, name):
         """Findet einen Drucker anhand seines Namens"""
-        for printer in self.printers:
-            if printer.name == name:
-                return printer
-        return None
+        return self.printers_by_name.get(name)
+
+    def get_selected_printer(self):
+        """Der in der Combobox gewählte Drucker, ohne den Anzeigetext zu zerlegen"""
+        return self.printer_index.get(self.printer_var.get())
+
+    def get_listbox_printer(self):
+        """Der in der Druckerverwaltung markierte Drucker (Listenposition = Position in self.printers)"""
+        selected_indices = self.printer_listbox.curselection()
+        if not selected_indices or selected_indices[0] >= len(self.printers):
+            return None
+        return self.printers[selected_indices[0]]
 
     def update_printer_lists(self):
-        """Aktualisiert die Drucker-Liste und die Combobox"""
+        """Aktualisiert die Drucker-Liste, die Combobox und die Zuordnungen"""
+        current = self.get_selected_printer()
+        self.printer_index = {printer_display(printer): printer for printer in self.printers}
+        self.printers_by_name = {printer.name: printer for printer in self.printers}
+        display_names = self.get_printer_list()
+        
         if hasattr(self, 'printer_listbox'):
             self.printer_listbox.delete(0, tk.END)
-            for display_name in self.get_printer_list():
-                self.printer_listbox.insert(tk.END, display_name)
+            self.printer_listbox.insert(tk.END, *display_names)
         
         if hasattr(self, 'printer_combo'):
-            current = self.printer_var.get()
-            self.printer_combo['values'] = self.get_printer_list()
-            if current and current in self.get_printer_list():
-                self.printer_var.set(current)
-            elif self.get_printer_list():
-                self.printer_var.set(self.get_printer_list()[0])
+            self.printer_combo['values'] = display_names
+            if current is not None and current.name in self.printers_by_name:
+                # Auch nach Umbenennen oder geänderter Leistung ausgewählt lassen
+                self.printer_var.set(printer_display(self.printers_by_name[current.name]))
+            elif display_names:
+                self.printer_var.set(display_names[0])
             else:
                 self.printer_var.set('')
 
@@ -459,106 +611,55 @@ class PrintCalculatorGUI:
             self.orca_status.configure(text="🔄 Suche nach OrcaSlicer Dateien...")
             self.root.update()
 
-            # Mögliche OrcaSlicer Pfade
-            orca_path = self.orca_path.get()
-            possible_paths = [
-                os.path.expanduser("~/AppData/Roaming/OrcaSlicer"),
-                "C:/Program Files/OrcaSlicer",
-                "C:/Program Files (x86)/OrcaSlicer",
-                "D:/Program Files/OrcaSlicer",
-                os.path.expanduser("~/Downloads")  # Auch im Downloads-Ordner suchen
-            ]
-            
-            # Wenn ein Pfad konfiguriert ist, diesen zuerst prüfen
-            if orca_path and os.path.exists(orca_path):
-                possible_paths.insert(0, orca_path)
-            
-            # Debug: Zeige Suchpfade
-            print("Suche in folgenden Pfaden:")
-            for path in possible_paths:
-                print(f"- {path}")
-            
-            # Suche nach der neuesten G-Code-Datei
-            gcode_file = None
-            newest_time = 0
-            
-            for base_path in possible_paths:
-                if os.path.exists(base_path):
-                    print(f"\nDurchsuche {base_path}:")
-                    # Suche rekursiv in allen Unterordnern
-                    for root, dirs, files in os.walk(base_path):
-                        gcode_files = [f for f in files if f.endswith('.gcode')]
-                        if gcode_files:
-                            print(f"  Gefunden in {root}:")
-                            for file in gcode_files:
-                                file_path = os.path.join(root, file)
-                                file_time = os.path.getmtime(file_path)
-                                print(f"  - {file} (Zeit: {file_time})")
-                                if file_time > newest_time:
-                                    newest_time = file_time
-                                    gcode_file = file_path
+            # Suche nach der neuesten G-Code-Datei (alle OrcaSlicer Pfade parallel)
+            scan = find_latest_gcode(self.orca_path.get(), time_budget=10)
+            gcode_file = scan.newest
+            print(f"Suche beendet: {scan.status_text()}")
             
             if not gcode_file:
                 self.orca_status.configure(
-                    text="⚠️ Keine OrcaSlicer G-Code-Dateien gefunden")
+                    text=f"⚠️ Keine OrcaSlicer G-Code-Dateien gefunden ({scan.status_text()})")
                 return
 
             print(f"\nVerwende Datei: {gcode_file}")
             
-            # Lese die G-Code-Datei
-            with open(gcode_file, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-            
-            # Debug: Zeige die ersten 500 Zeichen
-            print("\nDatei-Inhalt (Anfang):")
-            print(content[:500])
-            
-            # Extrahiere Informationen mit regulären Ausdrücken
-            import re
+            # Lese die G-Code-Datei in einem Durchlauf (Metadaten und Leistungsphasen)
+            printer = self.get_selected_printer()
+            profile = printer.power_profile() if printer else PowerProfile(0)
+            if os.path.getsize(gcode_file) >= LARGE_GCODE_SIZE:
+                # Sehr große Dateien werden in Byte-Bereichen auf allen Kernen ausgewertet
+                self.orca_status.configure(text="🔄 Große Datei, Auswertung auf allen Kernen...")
+                self.root.update()
+            self.gcode_scan = scan_file(gcode_file, profile)
+            self.batch_metadata = [self.gcode_scan]
+            self.update_preview_list()
+            stats = self.gcode_scan.stats
+            if stats:
+                print(f"Statistik: {stats.moves} Bewegungen, {stats.layers} Schichten, "
+                      f"{stats.extrusion_mm / 1000:.1f} m Filament, {stats.travel_mm / 1000:.1f} m Leerfahrt")
             
             # Druckzeit
-            time_patterns = [
-                r'estimated printing time = .*?(\d+)h\s*(\d+)m',
-                r'; estimated printing time \(normal mode\) = (\d+)h (\d+)m',
-                r'; total estimated printing time = (\d+)h (\d+)m'
-            ]
-            
-            time_match = None
-            for pattern in time_patterns:
-                time_match = re.search(pattern, content, re.IGNORECASE)
-                if time_match:
-                    break
-            
-            if time_match:
-                hours = float(time_match.group(1))
-                minutes = float(time_match.group(2))
-                total_hours = hours + (minutes / 60)
+            if self.gcode_scan.print_time_h is not None:
+                total_hours = self.gcode_scan.print_time_h
                 self.cost_entries["Druckzeit (h)"].delete(0, tk.END)
                 self.cost_entries["Druckzeit (h)"].insert(0, f"{total_hours:.2f}")
-                print(f"\nGefundene Druckzeit: {hours}h {minutes}m")
+                print(f"\nGefundene Druckzeit: {total_hours:.2f}h")
             
             # Filamentgewicht
-            weight_patterns = [
-                r'filament used = (\d+\.?\d*)g',
-                r'; filament used \[g\] = (\d+\.?\d*)',
-                r'; total filament used \[g\] = (\d+\.?\d*)'
-            ]
-            
-            weight_match = None
-            for pattern in weight_patterns:
-                weight_match = re.search(pattern, content, re.IGNORECASE)
-                if weight_match:
-                    break
-            
-            if weight_match:
-                weight = float(weight_match.group(1))
+            if self.gcode_scan.filament_weight_g is not None:
+                weight = self.gcode_scan.filament_weight_g
                 self.cost_entries["Filament Gewicht (g)"].delete(0, tk.END)
                 self.cost_entries["Filament Gewicht (g)"].insert(0, f"{weight:.1f}")
                 print(f"Gefundenes Gewicht: {weight}g")
             
+            print(f"Aufheizen (geschätzt): {self.gcode_scan.heatup_s:.0f}s, "
+                  f"Energie je Phase (kWh): {self.gcode_scan.summary()}")
+            self.gcode_scan_inputs = self.get_job_inputs()
+            
             # Zeige Erfolg an
             self.orca_status.configure(
-                text=f"✓ Erfolgreich importiert aus {os.path.basename(gcode_file)}")
+                text=f"✓ Erfolgreich importiert aus {os.path.basename(gcode_file)} ({self.gcode_scan.slicer})"
+                     f"\n({scan.status_text()})")
             
             # Berechne die Kosten neu
             self.calculate_costs()
@@ -568,13 +669,84 @@ class PrintCalculatorGUI:
             self.orca_status.configure(
                 text=f"⚠️ Fehler: {str(e)}")
 
+    def import_gcode_batch(self):
+        """Importiert mehrere G-Code-Dateien (beliebiger Slicer) und summiert Zeit und Gewicht"""
+        paths = filedialog.askopenfilenames(
+            title="G-Code-Dateien auswählen",
+            initialdir=self.orca_path.get() or None,
+            filetypes=[("G-Code", "*.gcode"), ("Alle Dateien", "*.*")]
+        )
+        if not paths:
+            return
+        
+        batch = read_batch(paths)
+        self.batch_metadata = batch.files
+        self.update_preview_list()
+        for meta in batch.files:
+            print(f"{os.path.basename(meta.path)}: {meta.slicer}, {meta.print_time_h}h, {meta.filament_weight_g}g")
+        for path in batch.unreadable:
+            print(f"Fehler beim Lesen von {path}")
+        
+        # Phasen gelten nur für eine einzelne Datei
+        self.gcode_scan = None
+        self.cost_entries["Druckzeit (h)"].delete(0, tk.END)
+        self.cost_entries["Druckzeit (h)"].insert(0, f"{batch.print_time_h:.2f}")
+        self.cost_entries["Filament Gewicht (g)"].delete(0, tk.END)
+        self.cost_entries["Filament Gewicht (g)"].insert(0, f"{batch.filament_weight_g:.1f}")
+        
+        summary = ", ".join(f"{count}× {name}" for name, count in batch.slicer_counts().items())
+        status = f"✓ {len(paths)} Dateien importiert ({summary})"
+        if batch.incomplete:
+            status += f"\n⚠️ Unvollständig: {', '.join(os.path.basename(path) for path in batch.incomplete)}"
+        self.orca_status.configure(text=status)
+        self.calculate_costs()
+
+    def update_preview_list(self):
+        """Zeigt die importierten Dateien und die Vorschau der ersten"""
+        self.preview_list.delete(0, tk.END)
+        for meta in self.batch_metadata:
+            self.preview_list.insert(tk.END, os.path.basename(meta.path))
+        if len(self.batch_metadata) > 1:
+            self.preview_list.pack(fill='x', pady=(10, 0), before=self.preview_label)
+        else:
+            self.preview_list.pack_forget()
+        if self.batch_metadata:
+            self.preview_list.selection_set(0)
+            self.show_preview(self.batch_metadata[0].path)
+        else:
+            self.show_preview(None)
+
+    def on_preview_select(self, event=None):
+        selection = self.preview_list.curselection()
+        if selection:
+            self.show_preview(self.batch_metadata[selection[0]].path)
+
+    def show_preview(self, path):
+        """Zeigt das eingebettete Vorschaubild einer G-Code-Datei"""
+        self.preview_image = None
+        data = None
+        if path:
+            try:
+                data = self.thumbnails.get(path, max_size=(200, 200))
+            except (OSError, ValueError) as e:
+                print(f"Vorschau nicht lesbar: {str(e)}")
+        if not data:
+            self.preview_label.configure(image='', text="Keine Vorschau" if path else "")
+            return
+        try:
+            self.preview_image = tk.PhotoImage(data=base64.b64encode(data))
+            self.preview_label.configure(image=self.preview_image, text="")
+        except tk.TclError as e:
+            print(f"Vorschau nicht darstellbar: {str(e)}")
+            self.preview_label.configure(image='', text="Keine Vorschau")
+
     def load_config(self):
-        """Lade die Konfiguration aus der config.json Datei"""
+        """Lade die Konfiguration (config.json, calculator_config.ini) aus dem Einstellungs-Cache"""
         try:
-            if os.path.exists('config.json'):
-                with open('config.json', 'r', encoding='utf-8') as f:
-                    self.config = json.load(f)
-                    self.orca_path.set(self.config.get('orca_path', ''))
+            self.config = dict(self.settings.get('config'))
+            self.orca_path.set(self.settings.orca_path)
+            if hasattr(self, 'tariff_path'):
+                self.tariff_path.set(self.config.get('tariff_file', ''))
         except Exception as e:
             messagebox.showwarning("Warnung", f"Fehler beim Laden der Konfiguration: {str(e)}")
             self.config = {}
@@ -582,70 +754,272 @@ class PrintCalculatorGUI:
     def save_config(self):
         """Speichere die Konfiguration in der config.json Datei"""
         try:
-            self.config['orca_path'] = self.orca_path.get()
-            with open('config.json', 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, indent=4)
+            with self.settings.batch():
+                self.settings.orca_path = self.orca_path.get()
+                if hasattr(self, 'tariff_path'):
+                    self.settings.update('config', tariff_file=self.tariff_path.get())
+            self.config = dict(self.settings.get('config'))
         except Exception as e:
             messagebox.showerror("Fehler", f"Fehler beim Speichern der Konfiguration: {str(e)}")
 
+    def load_tariff(self):
+        """Lädt den zeitabhängigen Stromtarif, falls einer konfiguriert ist"""
+        self.tariff = None
+        path = default_tariff_path(self.config)
+        if not path:
+            return
+        try:
+            self.tariff = load_tariff(path)
+            print(f"Stromtarif geladen: {path} ({len(self.tariff.prices)} Intervalle)")
+        except Exception as e:
+            messagebox.showwarning("Warnung", f"Fehler beim Laden des Stromtarifs: {str(e)}")
+
+    def sync_tariff_path(self):
+        """Übernimmt einen eingetippten oder eingefügten Tarifpfad"""
+        if not hasattr(self, 'tariff_path'):
+            return
+        if self.tariff_path.get().strip() != self.config.get('tariff_file', ''):
+            self.tariff_path.set(self.tariff_path.get().strip())
+            self.save_config()
+            self.load_tariff()
+
+    def browse_tariff_file(self):
+        path = filedialog.askopenfilename(
+            title="Wählen Sie die Tarifdatei",
+            filetypes=[("Tarifdateien", "*.csv *.json"), ("Alle Dateien", "*.*")]
+        )
+        if path:
+            self.tariff_path.set(path)
+            self.save_config()
+            self.load_tariff()
+            if self.tariff:
+                messagebox.showinfo("Erfolg", "Stromtarif wurde geladen!")
+
+    def get_job_inputs(self):
+        return (self.cost_entries["Druckzeit (h)"].get().strip(),
+                self.cost_entries["Filament Gewicht (g)"].get().strip())
+
+    def get_current_scan(self):
+        """Die Phasen der importierten Datei, solange Druckzeit und Gewicht nicht geändert wurden"""
+        if self.gcode_scan is not None and self.get_job_inputs() != self.gcode_scan_inputs:
+            self.gcode_scan = None
+            self.gcode_scan_inputs = None
+        return self.gcode_scan
+
+    def get_power_model(self, printer, print_time):
+        """Gibt die mittlere Leistung (W) und die Gesamtdauer (h) inkl. Aufheizen zurück"""
+        return power_model(printer, print_time, self.get_current_scan())
+
+    def run_price_analysis(self, mode):
+        """Berechnet die Preisverteilung über Raster oder Monte-Carlo-Stichproben"""
+        self.sync_tariff_path()
+        try:
+            printer = self.get_selected_printer()
+            if not printer:
+                messagebox.showwarning("Warnung", "Bitte wählen Sie einen Drucker aus.")
+                return
+
+            print_time = float(self.cost_entries["Druckzeit (h)"].get() or 0)
+            power_w, power_hours = self.get_power_model(printer, print_time)
+            power_price = float(self.cost_entries["Strompreis (€/kWh)"].get() or 0)
+            
+            # Mit Zeittarif: mittlerer Tarifpreis im Druckzeitraum statt Festpreis
+            price_note = "Strompreis: Festpreis"
+            if self.tariff:
+                start = self.get_print_start() or datetime.now()
+                try:
+                    power_price = self.tariff.average_price(start, power_hours)
+                    price_note = (f"Strompreis: Tarif ab {start:%d.%m. %H:%M}, "
+                                  f"Ø {power_price:.4f} €/kWh")
+                except ValueError:
+                    price_note = "Strompreis: Festpreis (Tarif deckt den Druckzeitraum nicht ab)"
+            
+            base = {
+                'print_time': power_hours,
+                'filament_weight': float(self.cost_entries["Filament Gewicht (g)"].get() or 0),
+                'power_price': power_price,
+                'filament_price': float(self.cost_entries["Filament Preis (€/kg)"].get() or 0),
+                'quantity': int(self.cost_entries["Stückzahl"].get() or 1),
+                'profit_margin': float(self.cost_entries["Gewinnmarge (%)"].get() or 0),
+                'power_consumption': power_w,
+                'failure_rate': float(self.analysis_entries["Ausfallrate (%)"].get() or 0) / 100
+            }
+            power_spread = float(self.analysis_entries["Schwankung Strompreis (%)"].get() or 0) / 100
+            filament_spread = float(self.analysis_entries["Schwankung Filamentpreis (%)"].get() or 0) / 100
+            margin_spread = float(self.analysis_entries["Spanne Gewinnmarge (±%)"].get() or 0)
+
+            if mode == 'monte_carlo':
+                samples = int(self.analysis_entries["Stichproben"].get() or 0)
+                distributions = {
+                    'power_price': ('normal', base['power_price'], base['power_price'] * power_spread),
+                    'filament_price': ('normal', base['filament_price'], base['filament_price'] * filament_spread)
+                }
+                if base['failure_rate'] > 0:
+                    distributions['failure_rate'] = (
+                        'triangular', 0, base['failure_rate'], min(2 * base['failure_rate'], 0.95))
+                results = monte_carlo(distributions, base, samples=samples)
+                title = f"Monte Carlo, {samples} Stichproben"
+            else:
+                steps = int(self.analysis_entries["Rasterschritte"].get() or 1)
+                margin = base['profit_margin']
+                ranges = {
+                    'power_price': spread(base['power_price'], power_spread, steps),
+                    'filament_price': spread(base['filament_price'], filament_spread, steps),
+                    'profit_margin': [margin - margin_spread + 2 * margin_spread * i / max(steps - 1, 1)
+                                      for i in range(steps)] if margin_spread else [margin]
+                }
+                results = grid_sweep(ranges, base)
+                title = f"Raster, {len(results['total_price'])} Kombinationen"
+
+            self.analysis_output.delete('1.0', tk.END)
+            self.analysis_output.insert(
+                tk.END, f"{title}\n{price_note}\n\n{format_table(percentile_table(results))}")
+
+        except ValueError as e:
+            messagebox.showerror("Fehler", f"Ungültige Eingabe: {str(e)}")
+
+    def get_print_start(self):
+        """Der eingegebene Druckstart oder None (auch bei ungültiger Eingabe, dann mit Hinweis)"""
+        start_text = self.cost_entries["Druckstart (JJJJ-MM-TT HH:MM)"].get().strip()
+        if not start_text:
+            return None
+        try:
+            start = datetime.fromisoformat(start_text)
+        except ValueError:
+            # Nur einmal je Eingabe melden, nicht für jede Exportzeile
+            if start_text != self.invalid_start_text:
+                self.invalid_start_text = start_text
+                messagebox.showerror(
+                    "Fehler", f"Ungültiger Druckstart: {start_text}\n"
+                              "Erwartet JJJJ-MM-TT HH:MM, es wird der aktuelle Zeitpunkt verwendet.")
+            return None
+        self.invalid_start_text = None
+        return start
+
+    def compute_quote(self, printer, print_time, filament_weight, quantity, use_phases=True,
+                      use_measured=True):
+        """Berechnet alle Kosten eines Auftrags mit den Preisen aus den Eingabefeldern
+
+        use_measured=False für Zeilen ohne eigenen Druckstart (Stapelimport):
+        der Druckstart aus dem Eingabefeld gehört nur zur aktuellen Berechnung.
+        """
+        # Nach Import: Aufheiz-, Leerlauf- und Abkühlphasen mit eigener Leistung
+        if use_phases:
+            power_consumption, power_hours = self.get_power_model(printer, print_time)
+        else:
+            power_consumption, power_hours = printer.power_consumption, print_time
+        
+        start = self.get_print_start()
+        
+        # Mit Druckstart und Steckdosen-Log: gemessene statt geschätzter Energie
+        measured_kwh = None
+        if use_measured and start and self.power_store.has_log(printer.name):
+            reading = self.power_store.measured_energy(printer.name, start, power_hours)
+            if reading:
+                measured_kwh = reading.window_kwh
+                print(f"Gemessener Verbrauch: {measured_kwh:.3f} kWh, Ø {reading.mean_watts:.0f} W "
+                      f"({reading.coverage:.0%} abgedeckt)")
+            else:
+                print("Stromlog deckt den Druckzeitraum nicht ab, verwende Schätzung")
+        if self.tariff and start is None:
+            start = datetime.now()
+        
+        return quote(QuoteInput(
+            print_time=print_time,
+            filament_weight=filament_weight,
+            power_consumption=power_consumption,
+            power_price=float(self.cost_entries["Strompreis (€/kWh)"].get() or 0),
+            filament_price=float(self.cost_entries["Filament Preis (€/kg)"].get() or 0),
+            profit_margin=float(self.cost_entries["Gewinnmarge (%)"].get() or 0),
+            quantity=quantity,
+            power_hours=power_hours,
+            start=start,
+            printer=printer.name,
+            measured_kwh=measured_kwh
+        ), self.tariff)
+
+    def iter_quote_rows(self, printer):
+        """Erzeugt eine Exportzeile je importierter Datei oder die aktuelle Berechnung"""
+        if len(self.batch_metadata) > 1:
+            for meta in self.batch_metadata:
+                row = self.compute_quote(printer, meta.print_time_h or 0, meta.filament_weight_g or 0,
+                                         1, use_phases=False, use_measured=False).as_dict()
+                row.update(name=os.path.basename(meta.path), slicer=meta.slicer)
+                yield row
+        elif self.last_quote:
+            row = self.last_quote.as_dict()
+            if self.batch_metadata:
+                row.update(name=os.path.basename(self.batch_metadata[0].path),
+                           slicer=self.batch_metadata[0].slicer)
+            else:
+                row.update(name="Manuelle Eingabe", slicer="")
+            yield row
+
+    def export_quotes(self):
+        """Exportiert die Kalkulation als CSV, JSON Lines oder HTML-Bericht"""
+        printer = self.get_selected_printer()
+        if not printer:
+            messagebox.showwarning("Warnung", "Bitte wählen Sie einen Drucker aus.")
+            return
+        self.calculate_costs()
+        
+        path = filedialog.asksaveasfilename(
+            title="Kalkulation exportieren",
+            defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("JSON", "*.json"), ("JSON Lines", "*.jsonl"),
+                       ("HTML-Bericht (druckbar als PDF)", "*.html")]
+        )
+        if not path:
+            return
+        try:
+            count = export_rows(self.iter_quote_rows(printer), path, fields=QUOTE_FIELDS)
+            messagebox.showinfo("Erfolg", f"{count} Positionen nach {os.path.basename(path)} exportiert.")
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Fehler", f"Fehler beim Export: {str(e)}")
+
     def calculate_costs(self):
         """Berechnet die Kosten basierend auf den Eingaben"""
+        self.sync_tariff_path()
         try:
             # Hole die Eingabewerte
             print_time = float(self.cost_entries["Druckzeit (h)"].get() or 0)
             filament_weight = float(self.cost_entries["Filament Gewicht (g)"].get() or 0)
             filament_price = float(self.cost_entries["Filament Preis (€/kg)"].get() or 0)
-            power_price = float(self.cost_entries["Strompreis (€/kWh)"].get() or 0)
             quantity = int(self.cost_entries["Stückzahl"].get() or 1)
-            profit_margin = float(self.cost_entries["Gewinnmarge (%)"].get() or 0)
             
             # Hole den Stromverbrauch des ausgewählten Druckers
-            printer_display = self.printer_var.get()
-            if not printer_display:
+            if not self.printer_var.get():
                 print("Kein Drucker ausgewählt")
                 return
                 
-            printer_name = self.get_printer_name_from_display(printer_display)
-            printer = self.get_printer_by_name(printer_name)
+            printer = self.get_selected_printer()
             if not printer:
                 print("Drucker nicht gefunden")
                 return
                 
-            power_consumption = printer.power_consumption
-            
-            # 1. Stromkosten berechnen
-            # Gesamte kWh = (Watt / 1000) * Stunden
-            total_kwh = (power_consumption / 1000) * print_time
-            # Stromkosten = kWh * Preis pro kWh
-            total_power_cost = total_kwh * power_price
-            
-            # 2. Filamentkosten berechnen
-            # Filamentgewicht ist bereits das Gesamtgewicht
-            # Umrechnung von g in kg und Multiplikation mit Preis pro kg
-            total_filament_cost = (filament_weight / 1000) * filament_price
-            
-            # 3. Basiskosten berechnen
-            total_base_cost = total_power_cost + total_filament_cost
-            
-            # 4. Kosten pro Stück
-            base_cost_per_piece = total_base_cost / quantity
-            
-            # 5. Gewinn berechnen
-            profit_per_piece = base_cost_per_piece * (profit_margin / 100)
-            total_profit = profit_per_piece * quantity
-            
-            # 6. Verkaufspreis berechnen
-            price_per_piece = base_cost_per_piece + profit_per_piece
-            total_price = price_per_piece * quantity
-            
-            # 7. Endrechnung berechnen
-            total_final = total_base_cost + total_profit
+            result = self.compute_quote(printer, print_time, filament_weight, quantity)
+            self.last_quote = result
+            power_consumption = result.input.power_consumption
+            power_hours = result.power_hours
+            total_kwh = result.total_kwh
+            total_power_cost = result.power_costs
+            total_filament_cost = result.filament_costs
+            total_base_cost = result.total_costs
+            base_cost_per_piece = result.cost_per_piece
+            profit_per_piece = result.profit_per_piece
+            total_profit = result.total_profit
+            price_per_piece = result.price_per_piece
+            total_final = result.final_price
+            cheapest_text = "-"
+            if result.cheapest_start:
+                best_start, best_cost = result.cheapest_start
+                cheapest_text = f"{best_start:%d.%m. %H:%M} ({best_cost:.2f} €)"
             
             # Debug-Ausgaben
             print(f"\nBerechnungsdetails:")
             print(f"1. Stromkosten:")
-            print(f"   - Verbrauch: {power_consumption}W")
-            print(f"   - Zeit: {print_time}h")
+            print(f"   - Verbrauch: {power_consumption:.1f}W")
+            print(f"   - Zeit: {power_hours:.2f}h")
             print(f"   - kWh: {total_kwh:.4f}")
             print(f"   - Kosten: {total_power_cost:.4f}€")
             
@@ -674,6 +1048,7 @@ class PrintCalculatorGUI:
                 text=f"{base_cost_per_piece:.2f} € (VK: {price_per_piece:.2f} €)")
             self.result_labels["Endrechnung"].configure(
                 text=f"Gesamt: {total_final:.2f} € (inkl. Gewinn)")
+            self.result_labels["Günstigster Start"].configure(text=cheapest_text)
             
         except ValueError as e:
             print(f"Fehler bei der Berechnung: {str(e)}")
@@ -689,17 +1064,11 @@ class PrintCalculatorGUI:
             self.save_config()
             messagebox.showinfo("Erfolg", "Orca Slicer Pfad wurde gespeichert!")
 
-    def get_printer_name_from_display(self, display_name):
-        """Extrahiert den Druckernamen aus der Anzeige"""
-        if '(' in display_name:
-            return display_name.split('(')[0].strip()
-        return display_name
-
     def add_printer(self):
         # Erstelle ein neues Fenster für die Eingabe
         add_window = tk.Toplevel(self.root)
         add_window.title("Drucker Hinzufügen")
-        add_window.geometry("300x200")
+        add_window.geometry("300x340")
 
         # Eingabefelder
         ttk.Label(add_window, text="Name:").pack(pady=5)
@@ -710,10 +1079,20 @@ class PrintCalculatorGUI:
         power_entry = ttk.Entry(add_window)
         power_entry.pack(pady=5)
 
+        ttk.Label(add_window, text="Aufheizen (W, optional, sonst geschätzt: 2× Druckleistung):").pack(pady=5)
+        heatup_entry = ttk.Entry(add_window)
+        heatup_entry.pack(pady=5)
+
+        ttk.Label(add_window, text="Leerlauf (W, optional, sonst geschätzt: 0,3× Druckleistung):").pack(pady=5)
+        idle_entry = ttk.Entry(add_window)
+        idle_entry.pack(pady=5)
+
         def save_printer():
             name = name_entry.get().strip()
             try:
                 power = float(power_entry.get().strip())
+                heatup = float(heatup_entry.get().strip() or 0) or None
+                idle = float(idle_entry.get().strip() or 0) or None
             except ValueError:
                 messagebox.showerror("Fehler", "Bitte geben Sie eine gültige Zahl für den Stromverbrauch ein.")
                 return
@@ -732,7 +1111,7 @@ class PrintCalculatorGUI:
                 return
 
             # Füge den neuen Drucker hinzu
-            new_printer = Printer(name, power)
+            new_printer = Printer(name, power, heatup, idle)
             self.printers.append(new_printer)
             self.save_printers()
             self.update_printer_lists()
@@ -743,23 +1122,15 @@ class PrintCalculatorGUI:
         ttk.Button(add_window, text="Speichern", command=save_printer).pack(pady=20)
 
     def edit_printer(self):
-        selected_indices = self.printer_listbox.curselection()
-        if not selected_indices:
-            messagebox.showwarning("Warnung", "Bitte wählen Sie einen Drucker aus.")
-            return
-
-        selected_index = selected_indices[0]
-        printer_name = self.printer_listbox.get(selected_index).split(" (")[0]
-        printer = self.get_printer_by_name(printer_name)
-
+        printer = self.get_listbox_printer()
         if not printer:
-            messagebox.showerror("Fehler", "Drucker nicht gefunden.")
+            messagebox.showwarning("Warnung", "Bitte wählen Sie einen Drucker aus.")
             return
 
         # Erstelle ein neues Fenster für die Bearbeitung
         edit_window = tk.Toplevel(self.root)
         edit_window.title("Drucker Bearbeiten")
-        edit_window.geometry("300x200")
+        edit_window.geometry("300x340")
 
         # Eingabefelder
         ttk.Label(edit_window, text="Name:").pack(pady=5)
@@ -772,10 +1143,22 @@ class PrintCalculatorGUI:
         power_entry.insert(0, str(printer.power_consumption))
         power_entry.pack(pady=5)
 
+        ttk.Label(edit_window, text="Aufheizen (W, optional, sonst geschätzt: 2× Druckleistung):").pack(pady=5)
+        heatup_entry = ttk.Entry(edit_window)
+        heatup_entry.insert(0, str(printer.heatup_power or ""))
+        heatup_entry.pack(pady=5)
+
+        ttk.Label(edit_window, text="Leerlauf (W, optional, sonst geschätzt: 0,3× Druckleistung):").pack(pady=5)
+        idle_entry = ttk.Entry(edit_window)
+        idle_entry.insert(0, str(printer.idle_power or ""))
+        idle_entry.pack(pady=5)
+
         def save_changes():
             new_name = name_entry.get().strip()
             try:
                 new_power = float(power_entry.get().strip())
+                new_heatup = float(heatup_entry.get().strip() or 0) or None
+                new_idle = float(idle_entry.get().strip() or 0) or None
             except ValueError:
                 messagebox.showerror("Fehler", "Bitte geben Sie eine gültige Zahl für den Stromverbrauch ein.")
                 return
@@ -793,6 +1176,8 @@ class PrintCalculatorGUI:
             # Aktualisiere die Druckerdaten
             printer.name = new_name
             printer.power_consumption = new_power
+            printer.heatup_power = new_heatup
+            printer.idle_power = new_idle
 
             # Speichere die Änderungen
             self.save_printers()
@@ -804,26 +1189,89 @@ class PrintCalculatorGUI:
         ttk.Button(edit_window, text="Speichern", command=save_changes).pack(pady=20)
 
     def remove_printer(self):
-        selected_indices = self.printer_listbox.curselection()
-        if not selected_indices:
-            messagebox.showwarning("Warnung", "Bitte wählen Sie einen Drucker aus.")
-            return
-
-        selected_index = selected_indices[0]
-        printer_name = self.printer_listbox.get(selected_index).split(" (")[0]
-        printer = self.get_printer_by_name(printer_name)
-
+        printer = self.get_listbox_printer()
         if not printer:
-            messagebox.showerror("Fehler", "Drucker nicht gefunden.")
+            messagebox.showwarning("Warnung", "Bitte wählen Sie einen Drucker aus.")
             return
 
         if messagebox.askyesno("Drucker löschen", 
-                             f"Möchten Sie den Drucker '{printer_name}' wirklich löschen?"):
+                             f"Möchten Sie den Drucker '{printer.name}' wirklich löschen?"):
             self.printers.remove(printer)
             self.save_printers()
             self.update_printer_lists()
             messagebox.showinfo("Erfolg", "Drucker wurde erfolgreich entfernt.")
 
+    def import_printer_file(self):
+        """Importiert viele Drucker aus CSV oder JSON und meldet fehlerhafte Zeilen"""
+        path = filedialog.askopenfilename(
+            title="Drucker importieren",
+            filetypes=[("Druckerlisten", "*.csv *.json *.jsonl"), ("Alle Dateien", "*.*")]
+        )
+        if not path:
+            return
+        try:
+            result = import_printers(path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Fehler", f"Fehler beim Lesen der Datei: {str(e)}")
+            return
+        
+        added, updated = merge_printers(self.printers, result.printers)
+        if added or updated:
+            self.save_printers()
+            self.update_printer_lists()
+        
+        message = f"{added} Drucker hinzugefügt, {updated} aktualisiert."
+        if result.errors:
+            report_path = os.path.splitext(path)[0] + "_fehler.csv"
+            try:
+                write_error_report(result.errors, report_path)
+                report_text = f"\n\nAlle Fehler: {report_path}"
+            except OSError:
+                report_text = ""
+            shown = "\n".join(str(error) for error in result.errors[:10])
+            more = f"\n... und {len(result.errors) - 10} weitere" if len(result.errors) > 10 else ""
+            messagebox.showwarning(
+                "Import mit Fehlern",
+                f"{message}\n{len(result.errors)} von {result.rows} Zeilen übersprungen:\n{shown}{more}{report_text}")
+        else:
+            messagebox.showinfo("Erfolg", message)
+
+    def export_printer_file(self):
+        path = filedialog.asksaveasfilename(
+            title="Drucker exportieren",
+            defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("JSON", "*.json"), ("JSON Lines", "*.jsonl")]
+        )
+        if not path:
+            return
+        try:
+            count = export_printers(self.printers, path)
+            messagebox.showinfo("Erfolg", f"{count} Drucker nach {os.path.basename(path)} exportiert.")
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Fehler", f"Fehler beim Export: {str(e)}")
+
+    def import_power_log(self):
+        """Importiert Leistungsmessungen (CSV einer smarten Steckdose) für einen Drucker"""
+        printer = self.get_listbox_printer() or self.get_selected_printer()
+        if not printer:
+            messagebox.showwarning("Warnung", "Bitte wählen Sie einen Drucker aus.")
+            return
+        paths = filedialog.askopenfilenames(
+            title=f"Stromlog für {printer.name} auswählen",
+            filetypes=[("CSV", "*.csv"), ("Alle Dateien", "*.*")]
+        )
+        if not paths:
+            return
+        try:
+            count = self.power_store.ingest(printer.name, paths)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Fehler", f"Fehler beim Import des Stromlogs: {str(e)}")
+            return
+        first, last = self.power_store.series(printer.name).span
+        span_text = f"\n{first:%d.%m.%Y %H:%M} bis {last:%d.%m.%Y %H:%M}" if first else ""
+        messagebox.showinfo("Erfolg", f"{count} Messwerte für {printer.name} gespeichert.{span_text}")
+        self.calculate_costs()
+
     def check_for_updates(self):
         """Prüft auf Updates vom GitHub Repository"""
         try:
@@ -869,9 +1317,24 @@ class PrintCalculatorGUI:
         copyright_label.pack(side='right')
 
 def main():
+    parser = argparse.ArgumentParser(description="3D Druck Kostenrechner")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    
+    profiler = start_profiler(args)
+    if profiler:
+        profiler.patch(PrintCalculatorGUI, 'import_from_orca')
+        profiler.patch(PrintCalculatorGUI, 'import_gcode_batch')
+        profiler.patch(PrintCalculatorGUI, 'calculate_costs')
+        # Die Dateisuche wird über den Modulnamen aufgerufen
+        profiler.patch(sys.modules[__name__], 'find_latest_gcode', 'scan_for_gcode')
+    
     root = tk.Tk()
     app = PrintCalculatorGUI(root)
     root.mainloop()
+    
+    if profiler:
+        print(profiler.finish())
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,224 @@
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from gcode_phases import GcodeScan, PowerProfile, scan_gcode
+from gcode_stats import LARGE_GCODE_SIZE, scan_large_gcode
+from slicer_parsers import GcodeMetadata, read_metadata
+from slicer_scan import ScanResult, ScanRoot, scan_for_gcode
+from tariff import TimeOfUseTariff
+
+# Headless calculation and import logic shared by the GUI and the command line.
+# Nothing here may import tkinter, so workers and scripts can use it directly.
+
+
+class Printer:
+    def __init__(self, name, power_consumption, heatup_power=None, idle_power=None, extra=None):
+        self.name = name
+        self.power_consumption = power_consumption  # in W
+        self.heatup_power = heatup_power
+        self.idle_power = idle_power
+        # Fields other parts of the program use (e.g. default_speed of the command line)
+        self.extra = extra or {}
+
+    def power_profile(self):
+        """Wattages for heat-up, idle and printing.
+
+        Heat-up and idle wattage and the heating rates (extra fields
+        bed_rate, hotend_rate in °C/s) are estimated unless set, see
+        gcode_phases.PowerProfile.
+        """
+        return PowerProfile(self.power_consumption, self.heatup_power, self.idle_power,
+                            bed_rate=self.extra.get('bed_rate'),
+                            hotend_rate=self.extra.get('hotend_rate'))
+
+    def to_dict(self):
+        data = dict(self.extra)
+        data.update({
+            "name": self.name,
+            "power_consumption": self.power_consumption
+        })
+        if self.heatup_power:
+            data["heatup_power"] = self.heatup_power
+        if self.idle_power:
+            data["idle_power"] = self.idle_power
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            name=data["name"],
+            power_consumption=data["power_consumption"],
+            heatup_power=data.get("heatup_power"),
+            idle_power=data.get("idle_power"),
+            extra={key: value for key, value in data.items()
+                   if key not in ("name", "power_consumption", "heatup_power", "idle_power")}
+        )
+
+
+@dataclass
+class QuoteInput:
+    print_time: float  # in h
+    filament_weight: float  # in g, for all pieces
+    power_consumption: float  # mean power in W
+    power_price: float  # in €/kWh
+    filament_price: float  # in €/kg
+    profit_margin: float = 0.0  # in %
+    quantity: int = 1
+    power_hours: Optional[float] = None  # powered time incl. heat-up, defaults to print_time
+    start: Optional[datetime] = None  # print start, needed for time-of-use tariffs
+    printer: str = ''
+    measured_kwh: Optional[float] = None  # from a power log for the whole window, replaces the wattage estimate
+
+
+@dataclass
+class Quote:
+    input: QuoteInput
+    total_kwh: float
+    power_costs: float
+    filament_costs: float
+    total_costs: float
+    cost_per_piece: float
+    profit_per_piece: float
+    total_profit: float
+    price_per_piece: float
+    final_price: float
+    cheapest_start: Optional[Tuple[datetime, float]] = None  # (start, power costs)
+
+    def as_dict(self) -> Dict:
+        """Flat row with inputs and results, e.g. for export_rows"""
+        row = dict(vars(self.input))
+        row['power_hours'] = self.power_hours
+        row.update({name: value for name, value in vars(self).items() if name != 'input'})
+        return row
+
+    @property
+    def power_hours(self) -> float:
+        if self.input.power_hours is None:
+            return self.input.print_time
+        return self.input.power_hours
+
+
+def power_model(printer: Printer, print_time: float,
+                scan: Optional[GcodeScan] = None) -> Tuple[float, float]:
+    """Mean power (W) and powered hours, including heat-up and cooldown from a scan"""
+    if not scan:
+        return printer.power_consumption, print_time
+    scan.build_phases(printer.power_profile())
+    total_kwh = scan.energy_kwh(print_time)
+    power_hours = print_time + scan.overhead_h()
+    if power_hours <= 0:
+        return printer.power_consumption, print_time
+    return total_kwh * 1000 / power_hours, power_hours
+
+
+def quote(inp: QuoteInput, tariff: Optional[TimeOfUseTariff] = None) -> Quote:
+    """Calculate all costs of a job.
+
+    A measured energy (power log, see EnergyReading.window_kwh) replaces
+    the printer's wattage; it must cover all power_hours. With a
+    tariff the power costs follow its price zones from inp.start
+    (default: now) and the cheapest start from then on is suggested; if
+    the tariff does not cover the job the flat power price is used.
+    """
+    power_hours = inp.print_time if inp.power_hours is None else inp.power_hours
+
+    power_consumption = inp.power_consumption
+    if inp.measured_kwh is not None and power_hours > 0:
+        power_consumption = inp.measured_kwh * 1000 / power_hours
+    total_kwh = (power_consumption / 1000) * power_hours
+    power_costs = total_kwh * inp.power_price
+    cheapest = None
+    if tariff:
+        start = inp.start or datetime.now()
+        try:
+            power_costs = tariff.energy_cost(start, power_hours, power_consumption)
+            cheapest = tariff.cheapest_start(power_hours, power_consumption, earliest=start)
+        except ValueError:
+            pass
+
+    # The filament weight already covers all pieces
+    filament_costs = (inp.filament_weight / 1000) * inp.filament_price
+    total_costs = power_costs + filament_costs
+
+    cost_per_piece = total_costs / inp.quantity
+    profit_per_piece = cost_per_piece * (inp.profit_margin / 100)
+    total_profit = profit_per_piece * inp.quantity
+
+    return Quote(
+        input=inp,
+        total_kwh=total_kwh,
+        power_costs=power_costs,
+        filament_costs=filament_costs,
+        total_costs=total_costs,
+        cost_per_piece=cost_per_piece,
+        profit_per_piece=profit_per_piece,
+        total_profit=total_profit,
+        price_per_piece=cost_per_piece + profit_per_piece,
+        final_price=total_costs + total_profit,
+        cheapest_start=cheapest
+    )
+
+
+def orca_scan_roots(orca_path: str = '') -> List[ScanRoot]:
+    """Folders searched for the latest slicer output, the configured one first"""
+    roots = [
+        ScanRoot(os.path.expanduser("~/AppData/Roaming/OrcaSlicer"),
+                 exclude=["system", "log", "cache", "printers"]),
+        ScanRoot("C:/Program Files/OrcaSlicer", max_depth=2, exclude=["resources"]),
+        ScanRoot("C:/Program Files (x86)/OrcaSlicer", max_depth=2, exclude=["resources"]),
+        ScanRoot("D:/Program Files/OrcaSlicer", max_depth=2, exclude=["resources"]),
+        # Also search Downloads, but not every folder below it
+        ScanRoot(os.path.expanduser("~/Downloads"), max_depth=1,
+                 exclude=["node_modules", ".git"])
+    ]
+    if orca_path and os.path.exists(orca_path):
+        roots.insert(0, ScanRoot(orca_path))
+    return roots
+
+
+def find_latest_gcode(orca_path: str = '', time_budget: Optional[float] = 10) -> ScanResult:
+    return scan_for_gcode(orca_scan_roots(orca_path), time_budget=time_budget)
+
+
+def scan_file(path: str, profile: PowerProfile) -> GcodeScan:
+    """Metadata and power phases of one file, in byte ranges on all cores if it is very large"""
+    if os.path.getsize(path) >= LARGE_GCODE_SIZE:
+        return scan_large_gcode(path, profile)
+    return scan_gcode(path, profile)
+
+
+@dataclass
+class BatchImport:
+    files: List[GcodeMetadata] = field(default_factory=list)
+    unreadable: List[str] = field(default_factory=list)
+
+    @property
+    def print_time_h(self) -> float:
+        return sum(meta.print_time_h or 0 for meta in self.files)
+
+    @property
+    def filament_weight_g(self) -> float:
+        return sum(meta.filament_weight_g or 0 for meta in self.files)
+
+    @property
+    def incomplete(self) -> List[str]:
+        return self.unreadable + [meta.path for meta in self.files if not meta.complete]
+
+    def slicer_counts(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for meta in self.files:
+            counts[meta.slicer] = counts.get(meta.slicer, 0) + 1
+        return counts
+
+
+def read_batch(paths: Sequence[str]) -> BatchImport:
+    """Read the metadata of several files (any slicer); unreadable files are listed"""
+    batch = BatchImport()
+    for path in paths:
+        try:
+            batch.files.append(read_metadata(path))
+        except OSError:
+            batch.unreadable.append(path)
+    return batch
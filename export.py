@@ -0,0 +1,155 @@
+import csv
+import html
+import itertools
+import json
+import os
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.json': 'json', '.html': 'html', '.htm': 'html'}
+
+# German column headers for the report
+LABELS = {
+    'name': 'Auftrag',
+    'printer': 'Drucker',
+    'slicer': 'Slicer',
+    'print_time': 'Druckzeit (h)',
+    'filament_weight': 'Filament (g)',
+    'quantity': 'Stückzahl',
+    'power_costs': 'Stromkosten (€)',
+    'filament_costs': 'Filamentkosten (€)',
+    'total_costs': 'Gesamtkosten (€)',
+    'price_per_piece': 'VK pro Stück (€)',
+    'final_price': 'Endpreis (€)'
+}
+
+QUOTE_FIELDS = list(LABELS)
+
+# Columns whose sum over all rows means something; the report leaves the others blank
+TOTAL_FIELDS = {'print_time', 'power_hours', 'filament_weight', 'quantity', 'total_kwh',
+                'power_costs', 'filament_costs', 'total_costs', 'total_profit', 'final_price'}
+
+_REPORT_HEAD = """<!DOCTYPE html>
+<html lang="de">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font-family: 'Segoe UI', sans-serif; font-size: 10pt; }}
+table {{ border-collapse: collapse; width: 100%; }}
+th, td {{ border-bottom: 1px solid #ccc; padding: 3px 6px; text-align: right; }}
+th:first-child, td:first-child {{ text-align: left; }}
+.page {{ page-break-after: always; margin-bottom: 2em; }}
+.footer {{ color: #666; font-size: 8pt; }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+"""
+
+
+def detect_format(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in FORMATS:
+        raise ValueError(f"Unbekanntes Exportformat: {ext or path}")
+    return FORMATS[ext]
+
+
+def _peek_fields(rows: Iterable[Dict]) -> Tuple[List[str], Iterator[Dict]]:
+    """Take the columns from the first row without consuming it"""
+    rows = iter(rows)
+    first = next(rows, None)
+    if first is None:
+        return [], iter(())
+    return list(first), itertools.chain([first], rows)
+
+
+def write_csv(rows: Iterable[Dict], f, fields: List[str]) -> int:
+    writer = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore', delimiter=';')
+    writer.writeheader()
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def write_jsonl(rows: Iterable[Dict], f, fields: List[str]) -> int:
+    count = 0
+    for row in rows:
+        f.write(json.dumps({key: row.get(key) for key in fields}, ensure_ascii=False))
+        f.write('\n')
+        count += 1
+    return count
+
+
+def write_json(rows: Iterable[Dict], f, fields: List[str]) -> int:
+    """One JSON array, written element by element"""
+    f.write('[')
+    count = 0
+    for row in rows:
+        f.write(',\n' if count else '\n')
+        f.write(json.dumps({key: row.get(key) for key in fields}, ensure_ascii=False))
+        count += 1
+    f.write('\n]\n' if count else ']\n')
+    return count
+
+
+def _cell(value) -> str:
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return html.escape('' if value is None else str(value))
+
+
+def write_html(rows: Iterable[Dict], f, fields: List[str], page_size: int = 40,
+               title: str = "3D Druck Kostenübersicht") -> int:
+    """Paginated report; each page is its own table with a print page break.
+
+    Only the current row and running totals are held in memory, so the
+    report can be printed to PDF from any browser regardless of its size.
+    The summary row totals TOTAL_FIELDS only, not prices per piece or power.
+    """
+    f.write(_REPORT_HEAD.format(title=html.escape(title)))
+    header = "<tr>" + "".join(f"<th>{html.escape(LABELS.get(k, k))}</th>" for k in fields) + "</tr>\n"
+    totals = {key: 0.0 if key in TOTAL_FIELDS else None for key in fields}
+    count = 0
+    page = 0
+
+    for row in rows:
+        if count % page_size == 0:
+            if page:
+                f.write(f"</table>\n<p class=\"footer\">Seite {page}</p>\n</div>\n")
+            page += 1
+            f.write(f"<div class=\"page\">\n<table>\n{header}")
+        f.write("<tr>" + "".join(f"<td>{_cell(row.get(k))}</td>" for k in fields) + "</tr>\n")
+        for key in fields:
+            value = row.get(key)
+            if isinstance(value, (int, float)) and not isinstance(value, bool) and totals[key] is not None:
+                totals[key] += value
+            else:
+                totals[key] = None
+        count += 1
+
+    if page:
+        f.write(f"</table>\n<p class=\"footer\">Seite {page}</p>\n</div>\n")
+    summary = "".join(
+        f"<td>{'' if value is None else _cell(value)}</td>" for value in totals.values())
+    f.write(f"<h2>Summe ({count} Positionen)</h2>\n<table>\n{header}<tr>{summary}</tr>\n</table>\n")
+    f.write("</body>\n</html>\n")
+    return count
+
+
+WRITERS = {'csv': write_csv, 'json': write_json, 'jsonl': write_jsonl, 'html': write_html}
+
+
+def export_rows(rows: Iterable[Dict], path: str, fmt: Optional[str] = None,
+                fields: Optional[List[str]] = None, **options) -> int:
+    """Stream rows (e.g. from a generator) into a CSV, JSON, JSON Lines or HTML file.
+
+    The format follows the file extension unless fmt is given; columns
+    default to the keys of the first row. Returns the number of rows.
+    """
+    fmt = fmt or detect_format(path)
+    if fields is None:
+        fields, rows = _peek_fields(rows)
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        return WRITERS[fmt](rows, f, fields, **options)
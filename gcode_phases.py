@@ -0,0 +1,157 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+from slicer_parsers import GcodeMetadata, read_head, sniff_parser
+
+_PARAM = re.compile(r'([A-Z])(-?\d+\.?\d*)')
+
+AMBIENT_TEMP = 25.0
+
+# Rough estimates for printers without measured values, typical of a
+# 200-350 W bed slinger; they change every quote that uses phases, so set
+# the printer's own heatup/idle wattage (and bed_rate/hotend_rate) if known.
+HEATUP_FACTOR = 2.0  # heat-up draws this multiple of the printing wattage
+IDLE_FACTOR = 0.3  # idle and cooldown draw this share of it
+BED_RATE = 0.7  # °C/s
+HOTEND_RATE = 3.0  # °C/s
+
+
+class PowerProfile:
+    """Wattages of a printer in its different operating phases.
+
+    heatup and idle default to estimates derived from the printing
+    wattage (HEATUP_FACTOR, IDLE_FACTOR), the heating rates to BED_RATE
+    and HOTEND_RATE.
+    """
+
+    def __init__(self, printing: float, heatup: Optional[float] = None,
+                 idle: Optional[float] = None, bed_rate: Optional[float] = None,
+                 hotend_rate: Optional[float] = None, cooldown_minutes: float = 5.0):
+        self.printing = printing
+        # Heaters run near full power while ramping up; fans and electronics idle
+        self.heatup = heatup if heatup else printing * HEATUP_FACTOR
+        self.idle = idle if idle else printing * IDLE_FACTOR
+        self.bed_rate = bed_rate or BED_RATE            # in °C/s
+        self.hotend_rate = hotend_rate or HOTEND_RATE   # in °C/s
+        self.cooldown_minutes = cooldown_minutes
+
+
+class Phase:
+    def __init__(self, name: str, duration_h: float, power_w: float):
+        self.name = name
+        self.duration_h = duration_h
+        self.power_w = power_w
+
+    @property
+    def energy_kwh(self) -> float:
+        return self.power_w / 1000 * self.duration_h
+
+
+class GcodeScan(GcodeMetadata):
+    """Result of a single streaming pass: slicer metadata plus power phases"""
+
+    def __init__(self, path: str, slicer: str):
+        super().__init__(path, slicer)
+        self.heatup_s = 0.0
+        self.idle_s = 0.0
+        self.cooled_down = False
+        self.phases: List[Phase] = []
+        self.stats = None  # GcodeStats when the file was analysed in byte ranges
+
+    def build_phases(self, profile: PowerProfile):
+        # A slicer time with preparation (Orca/Bambu total) already covers the heat-up
+        heatup_h = 0.0 if self.prepare_included else self.heatup_s / 3600
+        self.phases = [Phase('heatup', heatup_h, profile.heatup)]
+        if self.idle_s:
+            self.phases.append(Phase('idle', self.idle_s / 3600, profile.idle))
+        self.phases.append(Phase('printing', self.print_time_h or 0.0, profile.printing))
+        if self.cooled_down:
+            self.phases.append(Phase('cooldown', profile.cooldown_minutes / 60, profile.idle))
+
+    def energy_kwh(self, print_time_h: Optional[float] = None) -> float:
+        """Total energy; print_time_h overrides the slicer's printing duration"""
+        total = 0.0
+        for phase in self.phases:
+            if phase.name == 'printing' and print_time_h is not None:
+                total += phase.power_w / 1000 * print_time_h
+            else:
+                total += phase.energy_kwh
+        return total
+
+    def overhead_h(self) -> float:
+        """Duration of all phases except printing"""
+        return sum(p.duration_h for p in self.phases if p.name != 'printing')
+
+    def summary(self) -> Dict[str, float]:
+        return {p.name: round(p.energy_kwh, 4) for p in self.phases}
+
+
+def _params(line: str) -> Dict[str, float]:
+    return {key: float(value) for key, value in _PARAM.findall(line.split(';', 1)[0].upper())}
+
+
+HEATER_COMMANDS = ('M104', 'M109', 'M140', 'M190')
+
+
+def heatup_seconds(events: List[Tuple[str, float]], profile: PowerProfile) -> float:
+    """Time spent in blocking heater waits for the (command, target) events before printing"""
+    temps = {'bed': AMBIENT_TEMP, 'hotend': AMBIENT_TEMP}
+    total = 0.0
+    for command, target in events:
+        heater = 'bed' if command in ('M140', 'M190') else 'hotend'
+        if target <= 0:
+            temps[heater] = AMBIENT_TEMP
+        elif command in ('M190', 'M109'):
+            rate = profile.bed_rate if heater == 'bed' else profile.hotend_rate
+            total += max(target - temps[heater], 0) / rate
+            temps[heater] = target
+    return total
+
+
+def scan_gcode(path: str, profile: PowerProfile) -> GcodeScan:
+    """Read a G-code file once, extracting slicer metadata and heater phases.
+
+    Blocking heater waits (M190/M109) before the first extrusion count as
+    heat-up, using the profile's heating rates; G4 dwells before it count
+    as idle (later ones are part of the slicer's print time), and
+    switching the heaters off after printing adds a cooldown phase.
+    """
+    parser = sniff_parser(read_head(path))
+    scan = GcodeScan(path, parser.name)
+    events = []
+    printing = False
+
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        for line in f:
+            first = line[:1]
+            if first == ';':
+                if not scan.complete:
+                    parser.match(line, scan)
+                continue
+
+            if first == 'G':
+                if not printing and line.startswith(('G1 ', 'G1\t')) and 'E' in line:
+                    if _params(line).get('E', 0) > 0:
+                        printing = True
+                elif not printing and line.split(None, 1)[0].split(';', 1)[0] == 'G4':
+                    params = _params(line)
+                    scan.idle_s += params.get('S', 0) + params.get('P', 0) / 1000
+                continue
+
+            if first != 'M':
+                continue
+
+            command = line.split(None, 1)[0].upper()
+            if command not in HEATER_COMMANDS:
+                continue
+            params = _params(line)
+            target = params.get('S', params.get('R', 0))
+
+            if not printing:
+                events.append((command, target))
+            elif target <= 0:
+                scan.cooled_down = True
+
+    scan.heatup_s = heatup_seconds(events, profile)
+    scan.build_phases(profile)
+    return scan
@@ -0,0 +1,298 @@
+import math
+import mmap
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from gcode_phases import HEATER_COMMANDS, GcodeScan, PowerProfile, heatup_seconds
+from slicer_parsers import length_to_weight, read_metadata
+
+# Files from this size on are analysed in parallel byte ranges by the GUI
+LARGE_GCODE_SIZE = 256 * 1024 * 1024
+
+MIN_RANGE_SIZE = 16 * 1024 * 1024  # smallest byte range given to one worker
+BLOCK_SIZE = 8 * 1024 * 1024  # bytes copied out of the map at a time
+
+LAYER_MARKERS = (b';LAYER_CHANGE', b';LAYER:', b'; CHANGE_LAYER')
+AXES = 'XYZE'
+
+# Same reading as _parse: any case, optional indent, the command is a whole token
+# (so G91.1, arc centre mode, does not switch to relative moves)
+_MODE = re.compile(rb'^[ \t]*(G90|G91|M82|M83)(?=[ \t;\r\n]|$)', re.MULTILINE | re.IGNORECASE)
+_HEATERS = {command.encode() for command in HEATER_COMMANDS}
+
+
+class GcodeStats:
+    """Totals over a whole G-code file, merged exactly from byte ranges"""
+
+    def __init__(self):
+        self.extrusion_mm = 0.0
+        self.moves = 0
+        self.travel_mm = 0.0
+        self.layer_offsets: List[int] = []  # byte offset of each layer change marker
+        self.dwell_s = 0.0
+        self.idle_dwell_s = 0.0  # dwells before the first extrusion
+        self.heater_events: List[Tuple[str, float]] = []  # heater commands before printing
+        self.cooled_down = False
+        self.ranges = 0
+
+    @property
+    def layers(self) -> int:
+        return len(self.layer_offsets)
+
+    @property
+    def filament_weight_g(self) -> float:
+        return length_to_weight(self.extrusion_mm / 1000)
+
+
+class _RangeResult:
+    """Partial statistics of one byte range.
+
+    Axis positions are tracked as (known, value): known positions are
+    absolute, unknown ones are offsets from the position carried in from
+    the previous range. Absolute moves that depend on the carried-in
+    position are kept in deferred and resolved during the merge.
+    """
+
+    def __init__(self, start: int):
+        self.start = start
+        self.stats = GcodeStats()
+        self.deferred: List[Tuple[Dict[str, float], Dict[str, Tuple[float, float]]]] = []
+        self.positions: Dict[str, Tuple[bool, float]] = {axis: (False, 0.0) for axis in AXES}
+        self.extrudes = False
+        self.off_any = False
+        self.off_after_extrusion = False
+
+
+def _account(stats: GcodeStats, deltas: Dict[str, float]):
+    e = deltas.get('E', 0.0)
+    if e > 0:
+        stats.extrusion_mm += e
+    else:
+        stats.travel_mm += math.hypot(deltas.get('X', 0.0), deltas.get('Y', 0.0))
+
+
+def _parse(line: bytes) -> Tuple[bytes, Dict[str, float]]:
+    """Command and parameters of a line; bare letters (G28 X) count as present with 0"""
+    tokens = line.split(b';', 1)[0].split()
+    params = {}
+    for token in tokens[1:]:
+        letter = chr(token[0]).upper()
+        if len(token) == 1:
+            if letter.isalpha():
+                params[letter] = 0.0
+            continue
+        try:
+            params[letter] = float(token[1:])
+        except ValueError:
+            continue
+    return tokens[0].upper(), params
+
+
+def _split_ranges(mm, size: int, count: int) -> List[Tuple[int, int]]:
+    """Split [0, size) into up to count ranges that start right after a newline"""
+    bounds = [0]
+    for i in range(1, count):
+        nl = mm.find(b'\n', size * i // count)
+        if nl == -1:
+            break
+        if nl + 1 > bounds[-1]:
+            bounds.append(nl + 1)
+    bounds.append(size)
+    return [(a, b) for a, b in zip(bounds, bounds[1:]) if b > a]
+
+
+def _range_modes(path: str, start: int, end: int) -> Tuple[Optional[bool], Optional[bool]]:
+    """Last (absolute XYZ, absolute E) mode set inside a range, None if untouched"""
+    xyz_abs = e_abs = None
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for match in _MODE.finditer(mm, start, end):
+            command = match.group(1).upper()
+            if command in (b'G90', b'G91'):
+                xyz_abs = e_abs = command == b'G90'
+            else:
+                e_abs = command == b'M82'
+    return xyz_abs, e_abs
+
+
+def _range_stats(path: str, start: int, end: int, xyz_abs: bool, e_abs: bool) -> _RangeResult:
+    """Scan one byte range with the positioning modes carried in from before it"""
+    result = _RangeResult(start)
+    stats = result.stats
+    pos = result.positions
+
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        offset = start
+        while offset < end:
+            block_end = min(offset + BLOCK_SIZE, end)
+            if block_end < end:
+                nl = mm.rfind(b'\n', offset, block_end)
+                if nl == -1:
+                    nl = mm.find(b'\n', block_end, end)
+                block_end = end if nl == -1 else nl + 1
+
+            line_offset = offset
+            for line in mm[offset:block_end].split(b'\n'):
+                line_start = line_offset
+                line_offset += len(line) + 1
+                first = line[:1]
+
+                if first == b';':
+                    if line.startswith(LAYER_MARKERS):
+                        stats.layer_offsets.append(line_start)
+                    continue
+                if first != b'G' and first != b'M':
+                    # Rare: indented or lower-case commands, read the same way as _MODE
+                    line = line.lstrip()
+                    if line[:1] not in (b'G', b'M', b'g', b'm'):
+                        continue
+
+                command, params = _parse(line)
+
+                if command in (b'G0', b'G1', b'G2', b'G3'):
+                    # Arcs (slicer arc fitting) move and extrude like lines; their
+                    # travel is counted along the chord
+                    stats.moves += 1
+                    deltas = {}
+                    unknown = {}
+                    for axis in AXES:
+                        if axis not in params:
+                            continue
+                        value = params[axis]
+                        known, current = pos[axis]
+                        absolute = e_abs if axis == 'E' else xyz_abs
+                        if not absolute:
+                            deltas[axis] = value
+                            pos[axis] = (known, current + value)
+                        elif known:
+                            deltas[axis] = value - current
+                            pos[axis] = (True, value)
+                        else:
+                            unknown[axis] = (value, current)
+                            pos[axis] = (True, value)
+                    if unknown:
+                        result.deferred.append((deltas, unknown))
+                    else:
+                        _account(stats, deltas)
+                    if command != b'G0' and params.get('E', 0) > 0 and not result.extrudes:
+                        result.extrudes = True
+                elif command == b'G92':
+                    for axis in [a for a in AXES if a in params] or AXES:
+                        pos[axis] = (True, params.get(axis, 0.0))
+                elif command == b'G28':
+                    for axis in [a for a in 'XYZ' if a in params] or 'XYZ':
+                        pos[axis] = (True, 0.0)
+                elif command == b'G90':
+                    xyz_abs = e_abs = True
+                elif command == b'G91':
+                    xyz_abs = e_abs = False
+                elif command == b'M82':
+                    e_abs = True
+                elif command == b'M83':
+                    e_abs = False
+                elif command == b'G4':
+                    dwell = params.get('S', 0) + params.get('P', 0) / 1000
+                    stats.dwell_s += dwell
+                    if not result.extrudes:
+                        stats.idle_dwell_s += dwell
+                elif command in _HEATERS:
+                    target = params.get('S', params.get('R', 0))
+                    if not result.extrudes:
+                        stats.heater_events.append((command.decode(), target))
+                    if target <= 0:
+                        result.off_any = True
+                        if result.extrudes:
+                            result.off_after_extrusion = True
+            offset = block_end
+    return result
+
+
+def _merge(results: List[_RangeResult]) -> GcodeStats:
+    """Combine range results in file order, resolving deferred moves"""
+    total = GcodeStats()
+    total.ranges = len(results)
+    carry = {axis: 0.0 for axis in AXES}
+    printing = False
+
+    for result in sorted(results, key=lambda r: r.start):
+        part = result.stats
+        for deltas, unknown in result.deferred:
+            resolved = dict(deltas)
+            for axis, (value, offset) in unknown.items():
+                resolved[axis] = value - (carry[axis] + offset)
+            _account(part, resolved)
+
+        for axis, (known, value) in result.positions.items():
+            carry[axis] = value if known else carry[axis] + value
+
+        total.extrusion_mm += part.extrusion_mm
+        total.moves += part.moves
+        total.travel_mm += part.travel_mm
+        total.layer_offsets.extend(part.layer_offsets)
+        total.dwell_s += part.dwell_s
+
+        if printing:
+            total.cooled_down = total.cooled_down or result.off_any
+        else:
+            total.heater_events.extend(part.heater_events)
+            total.idle_dwell_s += part.idle_dwell_s
+            if result.extrudes:
+                printing = True
+                total.cooled_down = result.off_after_extrusion
+    return total
+
+
+def gcode_statistics(path: str, workers: Optional[int] = None,
+                     min_range_size: int = MIN_RANGE_SIZE) -> GcodeStats:
+    """Compute extrusion, moves, layers and travel of a file in parallel.
+
+    The file is split into line-aligned byte ranges. A first parallel pass
+    finds the positioning modes (G90/G91/M82/M83) each range leaves
+    behind, so every range starts with the exact modes of the file before
+    it; the second pass computes the partial statistics, which are merged
+    in order.
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return GcodeStats()
+    workers = workers or os.cpu_count() or 1
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        ranges = _split_ranges(mm, size, max(1, min(workers, size // min_range_size)))
+
+    if len(ranges) == 1:
+        return _merge([_range_stats(path, 0, size, True, True)])
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as pool:
+        modes = list(pool.map(_range_modes, [path] * len(ranges),
+                              [a for a, _ in ranges], [b for _, b in ranges]))
+        # Marlin starts in absolute mode for all axes
+        carried = []
+        xyz_abs = e_abs = True
+        for range_xyz, range_e in modes:
+            carried.append((xyz_abs, e_abs))
+            xyz_abs = xyz_abs if range_xyz is None else range_xyz
+            e_abs = e_abs if range_e is None else range_e
+        results = list(pool.map(_range_stats, [path] * len(ranges),
+                                [a for a, _ in ranges], [b for _, b in ranges],
+                                [x for x, _ in carried], [e for _, e in carried]))
+    return _merge(results)
+
+
+def scan_large_gcode(path: str, profile: PowerProfile, workers: Optional[int] = None) -> GcodeScan:
+    """Parallel counterpart of scan_gcode for multi-GB files"""
+    meta = read_metadata(path)
+    stats = gcode_statistics(path, workers)
+
+    scan = GcodeScan(path, meta.slicer)
+    scan.print_time_h = meta.print_time_h
+    scan.filament_weight_g = meta.filament_weight_g
+    scan.prepare_included = meta.prepare_included
+    if scan.filament_weight_g is None:
+        scan.filament_weight_g = stats.filament_weight_g
+    scan.heatup_s = heatup_seconds(stats.heater_events, profile)
+    scan.idle_s = stats.idle_dwell_s
+    scan.cooled_down = stats.cooled_down
+    scan.stats = stats
+    scan.build_phases(profile)
+    return scan
@@ -0,0 +1,219 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from calculator_core import Printer, Quote, QuoteInput, quote
+from settings import Settings
+from slicer_parsers import length_to_weight
+
+PAGE_SIZE = 100
+TIMEOUT = 10  # seconds per request
+
+
+@dataclass
+class PrintRecord:
+    """One finished print with the values the printer actually measured"""
+    source: str
+    job_id: str
+    filename: str
+    start_time: float  # POSIX timestamp
+    print_time_h: float
+    filament_weight_g: Optional[float] = None
+    success: bool = True
+
+
+class HistorySource(ABC):
+    """A print server whose job history can be read page by page.
+
+    Subclasses implement pages(), yielding lists of PrintRecords that
+    started after since, oldest first; the importer derives the next
+    cursor from their start times.
+    """
+    kind = ''
+
+    def __init__(self, base_url: str, api_key: str = ''):
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key
+
+    @property
+    def key(self) -> str:
+        """Identifies the server in the stored sync cursors"""
+        return f"{self.kind}:{self.base_url}"
+
+    def headers(self) -> Dict[str, str]:
+        return {'X-Api-Key': self.api_key} if self.api_key else {}
+
+    def get(self, session: requests.Session, path: str, **params) -> Dict:
+        response = session.get(self.base_url + path, params=params, headers=self.headers(),
+                               timeout=TIMEOUT)
+        response.raise_for_status()
+        return response.json()
+
+    @abstractmethod
+    def pages(self, session: requests.Session, since: float,
+              page_size: int = PAGE_SIZE) -> Iterator[List[PrintRecord]]:
+        """Yield lists of finished PrintRecords newer than since, oldest first"""
+
+
+class MoonrakerSource(HistorySource):
+    """Klipper/Moonraker: /server/history/list, paged server-side with start and since"""
+    kind = 'moonraker'
+
+    def pages(self, session, since, page_size=PAGE_SIZE):
+        start = 0
+        while True:
+            result = self.get(session, '/server/history/list', limit=page_size, start=start,
+                              since=since, order='asc')['result']
+            jobs = result.get('jobs', [])
+            records = []
+            for job in jobs:
+                if job.get('status') == 'in_progress':
+                    # Not finished yet: stop here so the cursor does not skip it
+                    if records:
+                        yield records
+                    return
+                if float(job.get('start_time') or 0) <= since:
+                    continue  # already imported by the previous sync
+                filament_mm = job.get('filament_used')
+                records.append(PrintRecord(
+                    source=self.key,
+                    job_id=str(job.get('job_id')),
+                    filename=job.get('filename', ''),
+                    start_time=float(job.get('start_time') or 0),
+                    print_time_h=float(job.get('print_duration') or 0) / 3600,
+                    filament_weight_g=length_to_weight(filament_mm / 1000) if filament_mm else None,
+                    success=job.get('status') == 'completed'
+                ))
+            if records:
+                yield records
+            if len(jobs) < page_size:
+                return
+            start += len(jobs)
+
+
+class OctoPrintSource(HistorySource):
+    """OctoPrint: per-file print statistics from /api/files.
+
+    OctoPrint itself only keeps the last print of each file and estimates
+    filament from its G-code analysis; the listing is not paged by the
+    server, so it is split into batches here.
+    """
+    kind = 'octoprint'
+
+    def _walk(self, entries: Iterable[Dict]) -> Iterator[Dict]:
+        for entry in entries:
+            if entry.get('children') is not None:
+                yield from self._walk(entry['children'])
+            elif entry.get('type') == 'machinecode':
+                yield entry
+
+    def pages(self, session, since, page_size=PAGE_SIZE):
+        data = self.get(session, '/api/files', recursive='true')
+        records = []
+        for entry in self._walk(data.get('files', [])):
+            last = (entry.get('prints') or {}).get('last') or {}
+            if not last.get('date') or not last.get('printTime') or last['date'] <= since:
+                continue
+            tools = ((entry.get('gcodeAnalysis') or {}).get('filament') or {}).values()
+            length_mm = sum(tool.get('length') or 0 for tool in tools)
+            records.append(PrintRecord(
+                source=self.key,
+                job_id=entry.get('path', entry.get('name', '')),
+                filename=entry.get('name', ''),
+                start_time=float(last['date']),
+                print_time_h=float(last['printTime']) / 3600,
+                filament_weight_g=length_to_weight(length_mm / 1000) if length_mm else None,
+                success=bool(last.get('success', True))
+            ))
+        records.sort(key=lambda record: record.start_time)
+        for i in range(0, len(records), page_size):
+            yield records[i:i + page_size]
+
+
+SOURCES = {source.kind: source for source in (MoonrakerSource, OctoPrintSource)}
+
+
+def make_source(kind: str, base_url: str, api_key: str = '') -> HistorySource:
+    if kind not in SOURCES:
+        raise ValueError(f"Unbekannter Druckserver: {kind}")
+    return SOURCES[kind](base_url, api_key)
+
+
+class JobHistoryImporter:
+    """Incremental import of job histories over one pooled keep-alive session.
+
+    The newest start time per server is stored in job_sync.json, so the
+    next sync only asks for newer jobs. Fetching does not move it:
+    call commit() once the records have been processed (e.g. exported),
+    otherwise the next sync returns the same jobs again.
+    """
+
+    def __init__(self, settings: Optional[Settings] = None, page_size: int = PAGE_SIZE,
+                 pool_size: int = 4, retries: int = 2):
+        self.settings = settings or Settings()
+        self.page_size = page_size
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size,
+                              max_retries=Retry(total=retries, backoff_factor=0.3,
+                                                status_forcelist=(502, 503, 504),
+                                                allowed_methods=('GET',)))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.session.close()
+
+    def cursor(self, source: HistorySource) -> float:
+        return float(self.settings.get('sync').get(source.key, 0))
+
+    def iter_records(self, source: HistorySource, full: bool = False) -> Iterator[PrintRecord]:
+        """Yield the jobs of one server newer than its cursor, page by page"""
+        since = 0.0 if full else self.cursor(source)
+        for page in source.pages(self.session, since, self.page_size):
+            yield from page
+
+    def sync(self, source: HistorySource, full: bool = False) -> List[PrintRecord]:
+        return list(self.iter_records(source, full))
+
+    def commit(self, source: HistorySource, records: Iterable[PrintRecord]) -> float:
+        """Advance the cursor past the given records; returns the stored cursor"""
+        cursor = self.cursor(source)
+        newest = max((record.start_time for record in records), default=cursor)
+        if newest > cursor:
+            self.settings.update('sync', **{source.key: newest})
+            cursor = newest
+        return cursor
+
+
+def quote_record(record: PrintRecord, printer: Printer, power_price: float,
+                 filament_price: float, profit_margin: float = 0.0) -> Quote:
+    """Costs of a job from its measured duration and filament use"""
+    return quote(QuoteInput(
+        print_time=record.print_time_h,
+        filament_weight=record.filament_weight_g or 0,
+        power_consumption=printer.power_consumption,
+        power_price=power_price,
+        filament_price=filament_price,
+        profit_margin=profit_margin,
+        printer=printer.name
+    ))
+
+
+def quote_records(records: Iterable[PrintRecord], printer: Printer, power_price: float,
+                  filament_price: float, profit_margin: float = 0.0) -> Iterator[Dict]:
+    """Export rows (see export.QUOTE_FIELDS) for measured jobs"""
+    for record in records:
+        row = quote_record(record, printer, power_price, filament_price, profit_margin).as_dict()
+        row.update(name=record.filename if record.success else f"{record.filename} (abgebrochen)",
+                   slicer='')
+        yield row
@@ -0,0 +1,228 @@
+import csv
+import hashlib
+import os
+import re
+from array import array
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+STORE_DIRECTORY = 'power_logs'
+SAMPLE_DTYPE = np.dtype([('t', '<f8'), ('w', '<f4')])  # packed: 12 bytes per sample
+MAX_GAP = 60.0  # seconds; longer gaps between samples count as missing data
+MIN_COVERAGE = 0.9  # share of a job window that must be measured to trust the result
+
+TIME_COLUMNS = ('timestamp', 'time', 'ts', 'date', 'datetime', 'zeit')
+POWER_COLUMNS = ('power', 'watts', 'power_w', 'apower', 'w', 'leistung')
+
+
+class EnergyReading:
+    def __init__(self, kwh: float, window_s: float, covered_s: float, samples: int):
+        self.kwh = kwh
+        self.window_s = window_s
+        self.covered_s = covered_s  # part of the window with samples at most MAX_GAP apart
+        self.samples = samples
+
+    @property
+    def coverage(self) -> float:
+        return self.covered_s / self.window_s if self.window_s > 0 else 0.0
+
+    @property
+    def mean_watts(self) -> float:
+        return self.kwh * 3.6e6 / self.covered_s if self.covered_s > 0 else 0.0
+
+    @property
+    def window_kwh(self) -> float:
+        """Energy of the whole window, with gaps filled at the measured mean power"""
+        return self.mean_watts * self.window_s / 3.6e6
+
+
+def _to_timestamp(value: str) -> float:
+    value = value.strip()
+    try:
+        number = float(value)
+    except ValueError:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    return number / 1000 if number > 1e11 else number  # milliseconds
+
+
+def _find_column(header, candidates) -> int:
+    names = [name.strip().lower() for name in header]
+    for candidate in candidates:
+        if candidate in names:
+            return names.index(candidate)
+    raise ValueError(f"Spalte fehlt, erwartet eine von: {', '.join(candidates)}")
+
+
+def read_power_csv(path: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Read a smart-plug log (time, power in W) into (timestamps, watts) arrays.
+
+    Samples are collected in typed arrays instead of lists of floats, so
+    months of 1 Hz data stay small while parsing.
+    """
+    times = array('d')
+    watts = array('f')
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        sample = f.read(4096)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=';,\t')
+        except csv.Error:
+            dialect = csv.excel
+        reader = csv.reader(f, dialect)
+        header = next(reader, None)
+        if header is None:
+            return np.empty(0), np.empty(0, dtype=np.float32)
+        time_col = _find_column(header, TIME_COLUMNS)
+        power_col = _find_column(header, POWER_COLUMNS)
+        for row in reader:
+            if len(row) <= max(time_col, power_col) or not row[power_col].strip():
+                continue
+            times.append(_to_timestamp(row[time_col]))
+            watts.append(float(row[power_col].replace(',', '.')))
+    return np.frombuffer(times, dtype=np.float64), np.frombuffer(watts, dtype=np.float32)
+
+
+class PowerSeries:
+    """Sorted power samples of one printer with a prefix sum of energy.
+
+    cumulative[i] is the energy in joules from the first sample up to
+    sample i (trapezoids over gaps longer than max_gap count as zero), so
+    the energy of any window is a difference of two prefix values plus
+    the partial trapezoids at its edges: O(log n) per query.
+    """
+
+    def __init__(self, timestamps: np.ndarray, watts: np.ndarray, max_gap: float = MAX_GAP):
+        self.timestamps = timestamps
+        self.watts = watts
+        self.max_gap = max_gap
+        dt = np.diff(timestamps)
+        self._valid = dt <= max_gap
+        segments = np.where(self._valid, (watts[1:] + watts[:-1].astype(np.float64)) * dt / 2, 0.0)
+        self.cumulative = np.concatenate(([0.0], np.cumsum(segments)))
+        self.covered = np.concatenate(([0.0], np.cumsum(np.where(self._valid, dt, 0.0))))
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def span(self) -> Tuple[Optional[datetime], Optional[datetime]]:
+        if not len(self):
+            return None, None
+        return (datetime.fromtimestamp(self.timestamps[0]),
+                datetime.fromtimestamp(self.timestamps[-1]))
+
+    def _prefix(self, t: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Energy (J) and measured seconds from the first sample up to each time in t"""
+        ts = self.timestamps
+        t = np.clip(t, ts[0], ts[-1])
+        i = np.clip(np.searchsorted(ts, t, side='right') - 1, 0, len(ts) - 2)
+        dt = t - ts[i]
+        span = ts[i + 1] - ts[i]
+        w0 = self.watts[i].astype(np.float64)
+        w_at = w0 + (self.watts[i + 1] - w0) * np.divide(dt, span, out=np.zeros_like(dt), where=span > 0)
+        valid = self._valid[i]
+        energy = self.cumulative[i] + np.where(valid, (w0 + w_at) * dt / 2, 0.0)
+        covered = self.covered[i] + np.where(valid, dt, 0.0)
+        return energy, covered
+
+    def energy(self, starts, ends) -> Tuple[np.ndarray, np.ndarray]:
+        """kWh and measured seconds for many windows at once (timestamps in s)"""
+        starts = np.atleast_1d(np.asarray(starts, dtype=np.float64))
+        ends = np.atleast_1d(np.asarray(ends, dtype=np.float64))
+        if len(self) < 2:
+            return np.zeros_like(starts), np.zeros_like(starts)
+        e0, c0 = self._prefix(starts)
+        e1, c1 = self._prefix(ends)
+        return (e1 - e0) / 3.6e6, c1 - c0
+
+    def reading(self, start: datetime, end: datetime) -> EnergyReading:
+        t0, t1 = start.timestamp(), end.timestamp()
+        kwh, covered = self.energy(t0, t1)
+        samples = int(np.searchsorted(self.timestamps, t1, side='right')
+                      - np.searchsorted(self.timestamps, t0, side='left'))
+        return EnergyReading(float(kwh[0]), t1 - t0, float(covered[0]), samples)
+
+
+class PowerStore:
+    """Per-printer power logs kept as one .npy file of (time, watts) records.
+
+    Timestamps and watts share a file, so replacing it on ingest is atomic.
+    Files are memory-mapped on load and the prefix sums are built once
+    per printer and cached until new data is ingested.
+    """
+
+    def __init__(self, directory: str = STORE_DIRECTORY, max_gap: float = MAX_GAP):
+        self.directory = directory
+        self.max_gap = max_gap
+        self._series: Dict[str, PowerSeries] = {}
+
+    def _base(self, printer_name: str) -> str:
+        slug = re.sub(r'[^\w.-]+', '_', printer_name)[:40]
+        digest = hashlib.sha1(printer_name.encode('utf-8')).hexdigest()[:8]
+        return os.path.join(self.directory, f"{slug}-{digest}")
+
+    def has_log(self, printer_name: str) -> bool:
+        return os.path.exists(self._base(printer_name) + '.npy')
+
+    def series(self, printer_name: str) -> Optional[PowerSeries]:
+        if printer_name in self._series:
+            return self._series[printer_name]
+        if not self.has_log(printer_name):
+            return None
+        samples = np.load(self._base(printer_name) + '.npy', mmap_mode='r')
+        series = PowerSeries(samples['t'], samples['w'], self.max_gap)
+        self._series[printer_name] = series
+        return series
+
+    def ingest(self, printer_name: str, paths: Iterable[str]) -> int:
+        """Add CSV logs to a printer's store; overlapping samples are de-duplicated.
+
+        Returns the total number of stored samples.
+        """
+        times = []
+        watts = []
+        existing = self.series(printer_name)
+        if existing is not None:
+            times.append(np.asarray(existing.timestamps))
+            watts.append(np.asarray(existing.watts))
+        for path in paths:
+            t, w = read_power_csv(path)
+            times.append(t)
+            watts.append(w)
+        t = np.concatenate(times) if times else np.empty(0)
+        w = np.concatenate(watts).astype(np.float32) if watts else np.empty(0, dtype=np.float32)
+
+        times = watts = existing = None  # release the memory maps before replacing the files
+        self._series.pop(printer_name, None)
+
+        order = np.argsort(t, kind='stable')
+        t, w = t[order], w[order]
+        keep = np.concatenate(([True], np.diff(t) > 0)) if len(t) else np.empty(0, dtype=bool)
+        t, w = t[keep], w[keep]
+
+        samples = np.empty(len(t), dtype=SAMPLE_DTYPE)
+        samples['t'] = t
+        samples['w'] = w
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._base(printer_name) + '.npy'
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.save(f, samples)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        return len(samples)
+
+    def measured_energy(self, printer_name: str, start: datetime, duration_h: float,
+                        min_coverage: float = MIN_COVERAGE) -> Optional[EnergyReading]:
+        """Measured energy of a job window, or None if the log does not cover it well enough"""
+        series = self.series(printer_name)
+        if series is None or duration_h <= 0:
+            return None
+        reading = series.reading(start, datetime.fromtimestamp(start.timestamp() + duration_h * 3600))
+        if reading.coverage < min_coverage:
+            return None
+        return reading
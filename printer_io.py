@@ -0,0 +1,182 @@
+import csv
+import json
+import math
+import os
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from calculator_core import Printer
+from export import export_rows
+
+PRINTER_FIELDS = ['name', 'power_consumption', 'heatup_power', 'idle_power']
+
+
+class RowError:
+    def __init__(self, line: int, message: str, name: str = ''):
+        self.line = line  # 1-based line of the record in the source file
+        self.message = message
+        self.name = name
+
+    def __str__(self) -> str:
+        label = f" ({self.name})" if self.name else ""
+        return f"Zeile {self.line}{label}: {self.message}"
+
+
+class PrinterImport:
+    def __init__(self):
+        self.printers: List[Printer] = []
+        self.errors: List[RowError] = []
+        self.rows = 0
+
+
+def printer_display(printer: Printer) -> str:
+    """Text shown for a printer in the combobox and list"""
+    return f"{printer.name} ({printer.power_consumption} W)"
+
+
+def _read_rows(path: str) -> Iterator[Tuple[int, Dict]]:
+    """Yield (line, record) from a CSV, JSON Lines or JSON array file"""
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        if os.path.splitext(path)[1].lower() in ('.json', '.jsonl'):
+            first = f.read(1)
+            while first.isspace():
+                first = f.read(1)
+            f.seek(0)
+            if first == '[':
+                # A JSON array can only be parsed as a whole; rows are still validated one by one
+                for i, record in enumerate(json.load(f), 1):
+                    yield i, record
+                return
+            for line, text in enumerate(f, 1):
+                if not text.strip():
+                    continue
+                try:
+                    yield line, json.loads(text)
+                except json.JSONDecodeError as e:
+                    yield line, ValueError(f"Ungültiges JSON: {e.msg}")
+            return
+
+        sample = f.read(4096)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=';,\t')
+        except csv.Error:
+            dialect = csv.excel
+        reader = csv.DictReader(f, dialect=dialect)
+        for record in reader:
+            yield reader.line_num, record
+
+
+def _number(record: Dict, key: str, required: bool) -> Optional[float]:
+    value = record.get(key)
+    if value is None or (isinstance(value, str) and not value.strip()):
+        if required:
+            raise ValueError(f"'{key}' fehlt")
+        return None
+    try:
+        number = float(str(value).replace(',', '.')) if isinstance(value, str) else float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"'{key}' ist keine Zahl: {value!r}")
+    if not math.isfinite(number):
+        raise ValueError(f"'{key}' ist keine endliche Zahl: {value!r}")
+    if number <= 0:
+        if required:
+            raise ValueError(f"'{key}' muss größer als 0 sein")
+        return None
+    return number
+
+
+def _plain(value):
+    """CSV cells are strings; keep numbers (e.g. default_speed) numeric.
+
+    'nan' and 'inf' stay strings, since printers.json cannot hold them.
+    """
+    if isinstance(value, str):
+        try:
+            number = float(value)
+        except ValueError:
+            return value
+        return number if math.isfinite(number) else value
+    return value
+
+
+def validate_printer(record: Dict) -> Printer:
+    """Build a printer from one imported record, raising ValueError if it is invalid"""
+    if not isinstance(record, dict):
+        raise ValueError("Eintrag ist kein Objekt")
+    name = str(record.get('name') or '').strip()
+    if not name:
+        raise ValueError("'name' fehlt")
+    extra = {key: _plain(value) for key, value in record.items()
+             if key and key not in PRINTER_FIELDS and value not in (None, '')}
+    return Printer(
+        name=name,
+        power_consumption=_number(record, 'power_consumption', required=True),
+        heatup_power=_number(record, 'heatup_power', required=False),
+        idle_power=_number(record, 'idle_power', required=False),
+        extra=extra
+    )
+
+
+def import_printers(path: str, max_errors: Optional[int] = None) -> PrinterImport:
+    """Read and validate printer definitions row by row.
+
+    Invalid rows and repeated names are collected as RowErrors instead of
+    aborting the import; with max_errors the file is not read further once
+    that many errors occurred.
+    """
+    result = PrinterImport()
+    seen: Dict[str, int] = {}
+    for line, record in _read_rows(path):
+        result.rows += 1
+        name = record.get('name', '') if isinstance(record, dict) else ''
+        try:
+            if isinstance(record, Exception):
+                raise record
+            printer = validate_printer(record)
+            if printer.name in seen:
+                raise ValueError(f"Name bereits in Zeile {seen[printer.name]} vergeben")
+        except ValueError as e:
+            result.errors.append(RowError(line, str(e), str(name or '')))
+            if max_errors and len(result.errors) >= max_errors:
+                break
+            continue
+        seen[printer.name] = line
+        result.printers.append(printer)
+    return result
+
+
+def export_printers(printers: Iterable[Printer], path: str) -> int:
+    """Write printers as CSV (;), JSON, JSON Lines or HTML, depending on the extension"""
+    printers = list(printers)
+    extra_fields = []
+    for printer in printers:
+        for key in printer.extra:
+            if key not in extra_fields:
+                extra_fields.append(key)
+    return export_rows((printer.to_dict() for printer in printers), path,
+                       fields=PRINTER_FIELDS + extra_fields)
+
+
+def write_error_report(errors: Iterable[RowError], path: str) -> int:
+    return export_rows(({'line': error.line, 'name': error.name, 'message': error.message}
+                        for error in errors), path, fields=['line', 'name', 'message'])
+
+
+def merge_printers(printers: List[Printer], imported: Iterable[Printer]) -> Tuple[int, int]:
+    """Update printers with the same name in place and append new ones.
+
+    Updates merge field by field, so values the import does not mention
+    (e.g. the command line's default_speed) are kept. Returns (added, updated).
+    """
+    positions = {printer.name: i for i, printer in enumerate(printers)}
+    added = updated = 0
+    for printer in imported:
+        if printer.name in positions:
+            i = positions[printer.name]
+            printers[i] = Printer.from_dict({**printers[i].to_dict(), **printer.to_dict()})
+            updated += 1
+        else:
+            positions[printer.name] = len(printers)
+            printers.append(printer)
+            added += 1
+    return added, updated
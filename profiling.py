@@ -0,0 +1,192 @@
+import argparse
+import atexit
+import cProfile
+import functools
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+PROFILE_DIRECTORY = 'profiles'
+# From 3.12 on cProfile uses sys.monitoring, which sees every thread but allows one profile at a time
+PER_THREAD_PROFILES = sys.version_info < (3, 12)
+_MISSING = object()
+
+
+class _Section:
+    def __init__(self, label: str):
+        self.label = label
+        self.profile = cProfile.Profile()
+        self.thread_profiles: List[cProfile.Profile] = []  # worker threads started during a call
+        self.calls = 0
+        self.seconds = 0.0
+        self.peak_bytes = 0
+
+
+class Profiler:
+    """cProfile and tracemalloc around selected functions for one session.
+
+    Every wrapped function gets its own section. Calls nested inside
+    another profiled call are counted but run under the outer profile,
+    since cProfile cannot be enabled twice. Before Python 3.12 cProfile
+    only sees its own thread, so threads started during a call (e.g. the
+    ThreadPool of scan_for_gcode) get a profile of their own that is
+    merged into the section. Worker processes (large G-code files in gcode_stats) are
+    not profiled; their time shows up in the waiting parent. finish()
+    puts back everything patch() replaced, writes one .pstats file per
+    section plus a tracemalloc snapshot to <directory>/<session>/ and
+    returns a short text summary.
+    """
+
+    def __init__(self, directory: str = PROFILE_DIRECTORY, top: int = 15):
+        self.session = datetime.now().strftime('%Y%m%d-%H%M%S')
+        self.directory = os.path.join(directory, self.session)
+        self.top = top
+        self.sections: Dict[str, _Section] = {}
+        self._active = 0
+        self._finished = False
+        self._patched: List[tuple] = []  # (owner, name, original or _MISSING), newest last
+        self._peak_bytes = 0  # process-wide peak, reset_peak() clears tracemalloc's own
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+
+    def wrap(self, func: Callable, label: Optional[str] = None) -> Callable:
+        label = label or func.__name__
+        section = self.sections.setdefault(label, _Section(label))
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            section.calls += 1
+            if self._active:
+                return func(*args, **kwargs)
+            self._active += 1
+            if hasattr(tracemalloc, 'reset_peak'):  # Python 3.9+
+                self._peak_bytes = max(self._peak_bytes, tracemalloc.get_traced_memory()[1])
+                tracemalloc.reset_peak()
+            start_bytes = tracemalloc.get_traced_memory()[0]
+            start = time.perf_counter()
+            if PER_THREAD_PROFILES:
+                threading.setprofile(self._thread_hook(section))
+            section.profile.enable()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                section.profile.disable()
+                if PER_THREAD_PROFILES:
+                    threading.setprofile(None)
+                section.seconds += time.perf_counter() - start
+                peak = tracemalloc.get_traced_memory()[1] - start_bytes
+                section.peak_bytes = max(section.peak_bytes, peak)
+                self._active -= 1
+        return wrapper
+
+    @staticmethod
+    def _thread_hook(section: _Section) -> Callable:
+        """Profile hook for new threads that switches them to a profile of their own"""
+        def hook(frame, event, arg):
+            profile = cProfile.Profile()
+            section.thread_profiles.append(profile)
+            profile.enable()  # replaces this hook for the rest of the thread
+        return hook
+
+    def patch(self, owner, name: str, label: Optional[str] = None):
+        """Replace owner.name (a class, module or instance attribute) by its profiled version"""
+        # Only what owner defines itself is put back; inherited attributes are deleted again
+        self._patched.append((owner, name, vars(owner).get(name, _MISSING)))
+        setattr(owner, name, self.wrap(getattr(owner, name), label or name))
+
+    def restore(self):
+        """Undo all patch() calls"""
+        while self._patched:
+            owner, name, original = self._patched.pop()
+            if original is _MISSING:
+                delattr(owner, name)
+            else:
+                setattr(owner, name, original)
+
+    def finish(self) -> str:
+        if self._finished:
+            return ''
+        self._finished = True
+        self.restore()
+        os.makedirs(self.directory, exist_ok=True)
+        used = [section for section in self.sections.values() if section.calls]
+        lines = [f"=== Profil {self.session} ({self.directory}) ==="]
+
+        combined = None
+        for section in used:
+            path = os.path.join(self.directory, f"{section.label}.pstats")
+            profiles = [profile for profile in [section.profile] + section.thread_profiles
+                        if profile.getstats()]
+            threads = f", {len(section.thread_profiles)} Threads" if section.thread_profiles else ""
+            lines.append(f"{section.label}: {section.calls} Aufrufe, {section.seconds:.3f} s, "
+                         f"Spitze {section.peak_bytes / 1024 / 1024:.1f} MB{threads}")
+            if not profiles:
+                section.profile.dump_stats(path)
+                continue
+            stats = pstats.Stats(*profiles)
+            stats.dump_stats(path)
+            if combined is None:
+                combined = stats
+            else:
+                combined.add(stats)
+
+        if tracemalloc.is_tracing():
+            tracemalloc.take_snapshot().dump(os.path.join(self.directory, 'memory.snapshot'))
+            current, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, self._peak_bytes)
+            lines.append(f"Speicher gesamt (ohne Worker-Prozesse): aktuell {current / 1024 / 1024:.1f} MB, "
+                         f"Spitze {peak / 1024 / 1024:.1f} MB")
+            tracemalloc.stop()
+
+        if combined is not None:
+            stream = io.StringIO()
+            combined.stream = stream
+            combined.sort_stats('cumulative').print_stats(self.top)
+            lines.append(f"\nTop {self.top} Funktionen (kumulativ):")
+            lines.append(_stats_table(stream.getvalue()))
+        return '\n'.join(lines)
+
+
+def _stats_table(text: str) -> str:
+    """Only the table of a pstats printout, without its preamble"""
+    rows: List[str] = []
+    for line in text.splitlines():
+        if rows or line.lstrip().startswith('ncalls'):
+            rows.append(line)
+    return '\n'.join(row for row in rows if row.strip())
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--profile', action='store_true',
+                        help='Import, Dateisuche und Kostenberechnung profilieren '
+                             '(inkl. Such-Threads; Worker-Prozesse für große G-Code-Dateien '
+                             'werden nicht erfasst)')
+    parser.add_argument('--profile-dir', default=PROFILE_DIRECTORY,
+                        help='Ordner für .pstats- und Speicher-Snapshots')
+    parser.add_argument('--profile-top', type=int, default=15,
+                        help='Anzahl der Funktionen in der Zusammenfassung')
+
+
+def start_profiler(args: argparse.Namespace) -> Optional[Profiler]:
+    """Create a profiler from the parsed arguments.
+
+    The caller reports through finish() when it is done; the exit hook
+    only covers sessions that end otherwise (exceptions, sys.exit).
+    """
+    if not args.profile:
+        return None
+    profiler = Profiler(args.profile_dir, args.profile_top)
+    atexit.register(_report_at_exit, profiler)
+    return profiler
+
+
+def _report_at_exit(profiler: Profiler):
+    summary = profiler.finish()
+    if summary:
+        print(summary)
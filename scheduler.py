@@ -0,0 +1,223 @@
+import csv
+import heapq
+import time
+from typing import Dict, Iterator, List, Optional
+
+COST_SLACK = 0.25  # cost mode: default extra makespan over the balanced schedule
+
+
+class Job:
+    def __init__(self, name: str, print_time: float, filament_weight: float = 0.0):
+        self.name = name
+        self.print_time = print_time  # in hours
+        self.filament_weight = filament_weight  # in g
+
+
+class ScheduledJob:
+    def __init__(self, job: Job, start: float, end: float, energy_kwh: float, power_costs: float):
+        self.job = job
+        self.start = start  # hours after schedule start
+        self.end = end
+        self.energy_kwh = energy_kwh
+        self.power_costs = power_costs
+
+
+class Schedule:
+    """Per-printer timelines produced by schedule_jobs"""
+
+    def __init__(self, timelines: Dict[str, List[ScheduledJob]]):
+        self.timelines = timelines
+
+    @property
+    def makespan(self) -> float:
+        return max((slots[-1].end for slots in self.timelines.values() if slots), default=0.0)
+
+    @property
+    def total_costs(self) -> float:
+        return sum(slot.power_costs for slots in self.timelines.values() for slot in slots)
+
+    @property
+    def total_kwh(self) -> float:
+        return sum(slot.energy_kwh for slots in self.timelines.values() for slot in slots)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {
+            name: {
+                'jobs': len(slots),
+                'hours': round(slots[-1].end if slots else 0.0, 2),
+                'power_costs': round(sum(s.power_costs for s in slots), 2)
+            }
+            for name, slots in self.timelines.items()
+        }
+
+
+def _list_schedule_makespan(jobs: List[Job], loads: List[float]) -> List[List[Job]]:
+    """Longest-processing-time list scheduling on a min-heap of printer loads"""
+    assigned: List[List[Job]] = [[] for _ in loads]
+    heap = [(load, i) for i, load in enumerate(loads)]
+    heapq.heapify(heap)
+    for job in jobs:
+        load, i = heapq.heappop(heap)
+        assigned[i].append(job)
+        loads[i] = load + job.print_time
+        heapq.heappush(heap, (loads[i], i))
+    return assigned
+
+
+def _list_schedule_cost(jobs: List[Job], watts: List[float], loads: List[float],
+                        horizon: float) -> List[List[Job]]:
+    """Give each job to the cheapest printer that still finishes within horizon.
+
+    Printers sit in a heap ordered by wattage. One that cannot take the
+    current job moves to a heap ordered by spare capacity and comes back
+    once the (descending) job durations fit again. When no printer fits,
+    the job goes to whichever printer finishes first.
+    """
+    assigned: List[List[Job]] = [[] for _ in loads]
+    cheap = [(w, i) for i, w in enumerate(watts)]
+    heapq.heapify(cheap)
+    blocked: List[tuple] = []
+    earliest = [(load, i) for i, load in enumerate(loads)]
+    heapq.heapify(earliest)
+    shortest = jobs[-1].print_time if jobs else 0.0
+
+    for job in jobs:
+        while blocked and -blocked[0][0] >= job.print_time:
+            _, i = heapq.heappop(blocked)
+            heapq.heappush(cheap, (watts[i], i))
+
+        target = None
+        while cheap:
+            i = cheap[0][1]
+            spare = horizon - loads[i]
+            if spare >= job.print_time:
+                target = i
+                break
+            heapq.heappop(cheap)
+            # Full for good once not even the shortest job fits any more
+            if spare >= shortest:
+                heapq.heappush(blocked, (-spare, i))
+
+        if target is None:
+            # Lazy heap: drop entries whose load is out of date
+            while earliest[0][0] != loads[earliest[0][1]]:
+                heapq.heappop(earliest)
+            target = earliest[0][1]
+
+        assigned[target].append(job)
+        loads[target] += job.print_time
+        heapq.heappush(earliest, (loads[target], target))
+    return assigned
+
+
+def _refine(assigned: List[List[Job]], watts: List[float], loads: List[float],
+            keep_costs: bool, max_iterations: int, time_budget: float):
+    """Local search: move or swap jobs off the busiest printer.
+
+    A step is taken only if it shortens the busiest printer's queue without
+    making the other one the new bottleneck; with keep_costs, steps that
+    raise energy use are rejected.
+    """
+    deadline = time.perf_counter() + time_budget
+    for _ in range(max_iterations):
+        if time.perf_counter() > deadline:
+            break
+        src = max(range(len(loads)), key=loads.__getitem__)
+        improved = False
+        for dst in sorted(range(len(loads)), key=loads.__getitem__):
+            if dst == src or loads[dst] >= loads[src]:
+                break
+            if keep_costs and watts[dst] > watts[src]:
+                continue
+            gap = loads[src] - loads[dst]
+
+            # Move the largest job that still leaves dst below the old maximum
+            best = None
+            for k, job in enumerate(assigned[src]):
+                if job.print_time < gap and (best is None or job.print_time > assigned[src][best].print_time):
+                    best = k
+            if best is not None:
+                job = assigned[src].pop(best)
+                assigned[dst].append(job)
+                loads[src] -= job.print_time
+                loads[dst] += job.print_time
+                improved = True
+                break
+
+            # Otherwise swap a long job on src for a shorter one on dst
+            for a, job_a in enumerate(assigned[src]):
+                for b, job_b in enumerate(assigned[dst]):
+                    delta = job_a.print_time - job_b.print_time
+                    if 0 < delta < gap:
+                        assigned[src][a], assigned[dst][b] = job_b, job_a
+                        loads[src] -= delta
+                        loads[dst] += delta
+                        improved = True
+                        break
+                if improved:
+                    break
+            if improved:
+                break
+        if not improved:
+            break
+
+
+def schedule_jobs(jobs: List[Job], printers: Dict[str, float], power_cost: float,
+                  objective: str = 'makespan', max_makespan: Optional[float] = None,
+                  slack: float = COST_SLACK, refine: bool = True, max_iterations: int = 2000,
+                  time_budget: float = 0.3, tariff=None, start=None) -> Schedule:
+    """Assign jobs to printers (name -> watts) and build their timelines.
+
+    objective 'makespan' balances the queues; 'cost' fills the cheapest
+    printers first while keeping every queue within max_makespan (default:
+    the makespan of the balanced schedule times 1 + slack). The slack is
+    the trade-off: at 0 the balanced schedule leaves no room to move work
+    to cheaper printers, larger values save more power costs but let the
+    whole batch finish later. With a tariff and start datetime, each slot
+    is priced at the tariff instead of power_cost.
+    """
+    if objective not in ('makespan', 'cost'):
+        raise ValueError(f"Unbekanntes Optimierungsziel: {objective}")
+    if not printers:
+        raise ValueError("Keine Drucker vorhanden")
+    if slack < 0:
+        raise ValueError("Der Spielraum darf nicht negativ sein")
+
+    names = list(printers)
+    watts = [float(printers[name]) for name in names]
+    ordered = sorted(jobs, key=lambda job: job.print_time, reverse=True)
+
+    loads = [0.0] * len(names)
+    assigned = _list_schedule_makespan(ordered, loads)
+    if objective == 'cost':
+        horizon = max_makespan if max_makespan is not None else max(loads) * (1 + slack)
+        loads = [0.0] * len(names)
+        assigned = _list_schedule_cost(ordered, watts, loads, horizon)
+    if refine:
+        _refine(assigned, watts, loads, objective == 'cost', max_iterations, time_budget)
+
+    timelines: Dict[str, List[ScheduledJob]] = {}
+    for name, w, queue in zip(names, watts, assigned):
+        slots = []
+        clock = 0.0
+        for job in queue:
+            energy = w / 1000 * job.print_time
+            if tariff is not None and start is not None:
+                costs = tariff.energy_cost(start.timestamp() + clock * 3600, job.print_time, w)
+            else:
+                costs = energy * power_cost
+            slots.append(ScheduledJob(job, clock, clock + job.print_time, energy, costs))
+            clock += job.print_time
+        timelines[name] = slots
+    return Schedule(timelines)
+
+
+def iter_jobs(path: str) -> Iterator[Job]:
+    """Read jobs one by one from a CSV with columns name, print_time (h), optional filament_weight (g)"""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        for row in csv.DictReader(f):
+            yield Job(row['name'], float(row['print_time']), float(row.get('filament_weight') or 0))
+
+
+def load_jobs(path: str) -> List[Job]:
+    return list(iter_jobs(path))
@@ -0,0 +1,276 @@
+import configparser
+import copy
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+LOCK_TIMEOUT = 5.0  # seconds to wait for another instance's lock
+STALE_LOCK_AGE = 30.0  # locks older than this are left over from a crash
+
+
+class SettingsFile:
+    """One file of the settings directory and how to (de)serialize it.
+
+    kind is 'json' or 'ini'. key names the field that identifies the
+    records of a JSON list (e.g. printers by 'name'), so that concurrent
+    changes from several instances can be merged record by record.
+    """
+
+    def __init__(self, filename: str, kind: str = 'json', default: Any = None,
+                 key: Optional[str] = None):
+        self.filename = filename
+        self.kind = kind
+        self.default = default
+        self.key = key
+
+    def read(self, path: str) -> Any:
+        if self.kind == 'ini':
+            parser = configparser.ConfigParser()
+            parser.read(path, encoding='utf-8')
+            return {section: dict(parser[section]) for section in parser.sections()}
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def write(self, f, data: Any):
+        if self.kind == 'ini':
+            parser = configparser.ConfigParser()
+            parser.read_dict(data)
+            parser.write(f)
+        else:
+            json.dump(data, f, indent=4)
+
+    def to_map(self, data: Any) -> Dict[str, Any]:
+        if self.key and isinstance(data, list):
+            return {str(record[self.key]): record for record in data}
+        return dict(data or {})
+
+    def from_map(self, mapping: Dict[str, Any], ordered_like: Any) -> Any:
+        if not (self.key and isinstance(ordered_like, list)):
+            return mapping
+        # Keep our record order, records only the other instance knows go last
+        names = [str(record[self.key]) for record in ordered_like]
+        names += [name for name in mapping if name not in names]
+        return [mapping[name] for name in names if name in mapping]
+
+
+FILES = {
+    'config': SettingsFile('config.json', default={}),
+    'ini': SettingsFile('calculator_config.ini', kind='ini', default={}),
+    'printers': SettingsFile('printers.json', default=None, key='name'),
+    'sync': SettingsFile('job_sync.json', default={})
+}
+
+
+def _three_way_merge(base: Dict[str, Any], ours: Dict[str, Any], theirs: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep everything we changed since loading, take the rest from disk"""
+    merged = dict(theirs)
+    for name in set(base) | set(ours):
+        if name not in ours:
+            if name in base:
+                merged.pop(name, None)
+        elif base.get(name) != ours[name]:
+            merged[name] = ours[name]
+    return merged
+
+
+class _Entry:
+    def __init__(self, stamp, data, base):
+        self.stamp = stamp
+        self.data = data
+        self.base = base  # deep copy of data as loaded, for merging
+        self.dirty = False
+
+
+class Settings:
+    """Cached access to config.json, calculator_config.ini, printers.json and job_sync.json.
+
+    Files are parsed once and served from memory until their mtime or size
+    changes. set() only marks a file dirty; flush() writes all dirty files
+    atomically (temp file + os.replace) under a lock file, merging in
+    changes another instance made since we loaded them.
+    """
+
+    def __init__(self, directory: str = '.', files: Optional[Dict[str, SettingsFile]] = None):
+        self.directory = directory
+        self.files = files or FILES
+        self._cache: Dict[str, _Entry] = {}
+        self._batch_depth = 0
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, self.files[name].filename)
+
+    def _stamp(self, name: str):
+        try:
+            st = os.stat(self.path(name))
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def exists(self, name: str) -> bool:
+        return self._stamp(name) is not None
+
+    def _load(self, name: str) -> _Entry:
+        spec = self.files[name]
+        stamp = self._stamp(name)
+        data = spec.read(self.path(name)) if stamp else copy.deepcopy(spec.default)
+        return _Entry(stamp, data, copy.deepcopy(data))
+
+    def get(self, name: str) -> Any:
+        """Return a copy of the cached contents, re-reading only if the file changed.
+
+        Changing the returned object has no effect; use set() or update().
+        """
+        entry = self._cache.get(name)
+        if entry is None or (not entry.dirty and entry.stamp != self._stamp(name)):
+            entry = self._cache[name] = self._load(name)
+        return copy.deepcopy(entry.data)
+
+    def changed(self, name: str) -> bool:
+        """True if the file on disk differs from what is cached.
+
+        A file that was not loaded yet is loaded now and counts as
+        unchanged, so later calls report changes made from then on.
+        """
+        entry = self._cache.get(name)
+        if entry is None:
+            self.get(name)
+            return False
+        return entry.stamp != self._stamp(name)
+
+    def set(self, name: str, data: Any):
+        if name not in self._cache:
+            self.get(name)
+        entry = self._cache[name]
+        entry.data = copy.deepcopy(data)
+        entry.dirty = True
+        if not self._batch_depth:
+            self.flush()
+
+    def update(self, name: str, **values):
+        """Set individual keys of a dict-shaped file"""
+        data = dict(self.get(name) or {})
+        data.update(values)
+        self.set(name, data)
+
+    @contextmanager
+    def batch(self):
+        """Collect several set() calls and write them together"""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self.flush()
+
+    def flush(self):
+        dirty = [name for name, entry in self._cache.items() if entry.dirty]
+        if not dirty:
+            return
+        with self._lock():
+            for name in dirty:
+                self._write(name)
+
+    def _write(self, name: str):
+        spec = self.files[name]
+        entry = self._cache[name]
+        data = entry.data
+
+        # Another instance wrote since we loaded: merge instead of clobbering
+        if entry.stamp != self._stamp(name) and self.exists(name):
+            theirs = spec.read(self.path(name))
+            merged = _three_way_merge(spec.to_map(entry.base), spec.to_map(data), spec.to_map(theirs))
+            data = spec.from_map(merged, data)
+
+        fd, tmp_path = tempfile.mkstemp(prefix=f'.{spec.filename}.', suffix='.tmp',
+                                        dir=self.directory or '.')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                spec.write(f, data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path(name))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        entry.data = data
+        entry.base = copy.deepcopy(data)
+        entry.stamp = self._stamp(name)
+        entry.dirty = False
+
+    def _remove_stale_lock(self, lock_path: str, stale: os.stat_result):
+        """Take a stale lock out of the way without touching a fresh one.
+
+        The lock is renamed to a name only we use, so of several instances
+        that found it stale only one gets it. If what we renamed is not the
+        lock we judged stale (another instance replaced it meanwhile), it
+        is put back unless a newer lock exists already.
+        """
+        taken = f"{lock_path}.{os.getpid()}.{time.monotonic_ns()}.stale"
+        try:
+            os.replace(lock_path, taken)
+        except FileNotFoundError:
+            return
+        st = os.stat(taken)
+        if (st.st_ino, st.st_mtime_ns) != (stale.st_ino, stale.st_mtime_ns):
+            try:
+                os.link(taken, lock_path)
+            except OSError:
+                pass
+        os.remove(taken)
+
+    @contextmanager
+    def _lock(self):
+        """Cross-process lock via an exclusively created lock file"""
+        lock_path = os.path.join(self.directory, '.settings.lock')
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        while True:
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                break
+            except FileExistsError:
+                try:
+                    st = os.stat(lock_path)
+                    if time.time() - st.st_mtime > STALE_LOCK_AGE:
+                        self._remove_stale_lock(lock_path, st)
+                        continue
+                except FileNotFoundError:
+                    continue
+                if time.monotonic() > deadline:
+                    raise TimeoutError("Einstellungen sind durch eine andere Instanz gesperrt")
+                time.sleep(0.05)
+        own = os.fstat(fd).st_ino
+        try:
+            os.write(fd, str(os.getpid()).encode())
+            os.close(fd)
+            yield
+        finally:
+            # Only remove the lock if it is still ours
+            try:
+                if os.stat(lock_path).st_ino == own:
+                    os.remove(lock_path)
+            except FileNotFoundError:
+                pass
+
+    @property
+    def orca_path(self) -> str:
+        """Orca Slicer path: config.json wins over calculator_config.ini"""
+        path = self.get('config').get('orca_path')
+        if path:
+            return path
+        return self.get('ini').get('OrcaSlicer', {}).get('path', '')
+
+    @orca_path.setter
+    def orca_path(self, path: str):
+        with self.batch():
+            if self.get('config').get('orca_path') != path:
+                self.update('config', orca_path=path)
+            ini = copy.deepcopy(self.get('ini'))
+            if ini.get('OrcaSlicer', {}).get('path') != path:
+                ini.setdefault('OrcaSlicer', {})['path'] = path
+                self.set('ini', ini)
@@ -0,0 +1,217 @@
+import math
+import os
+import re
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+SNIFF_SIZE = 8 * 1024  # bytes read to identify the slicer
+
+# Cura only reports filament length; converted with these defaults
+FILAMENT_DIAMETER = 1.75  # in mm
+FILAMENT_DENSITY = 1.24  # in g/cm³ (PLA)
+
+_DURATION = re.compile(r'(\d+(?:\.\d+)?)\s*([dhms])', re.IGNORECASE)
+
+
+def parse_duration(text: str) -> Optional[float]:
+    """Convert slicer durations like '1d 2h 3m 4s' or '45m 10s' to hours"""
+    factors = {'d': 24, 'h': 1, 'm': 1 / 60, 's': 1 / 3600}
+    parts = _DURATION.findall(text)
+    if not parts:
+        return None
+    return sum(float(value) * factors[unit.lower()] for value, unit in parts)
+
+
+def length_to_weight(length_m: float) -> float:
+    """Filament weight in g for a length in m"""
+    radius_cm = FILAMENT_DIAMETER / 20
+    return length_m * 100 * math.pi * radius_cm ** 2 * FILAMENT_DENSITY
+
+
+@dataclass
+class GcodeMetadata:
+    path: str
+    slicer: str
+    print_time_h: Optional[float] = None
+    filament_weight_g: Optional[float] = None
+    prepare_included: bool = False  # print_time_h already contains heat-up and preparation
+
+    @property
+    def complete(self) -> bool:
+        return self.print_time_h is not None and self.filament_weight_g is not None
+
+
+class SlicerParser:
+    """Base class for slicer-specific metadata parsers.
+
+    Subclasses set a name, the signature that identifies their G-code in
+    the first few KB, where their keys live ('header', 'footer', 'both'
+    or 'full') and (field, pattern, converter) triples.
+    """
+    name = ''
+    signature: Optional[re.Pattern] = None
+    location = 'full'
+    head_size = 16 * 1024
+    tail_size = 256 * 1024
+    patterns: List[Tuple[str, re.Pattern, Callable[[str], Optional[float]]]] = []
+
+    def sniff(self, head: str) -> bool:
+        return bool(self.signature and self.signature.search(head))
+
+    def match(self, text: str, meta: GcodeMetadata):
+        """Fill the metadata fields that are still missing from text"""
+        for field, pattern, convert in self.patterns:
+            if getattr(meta, field) is not None:
+                continue
+            found = pattern.search(text)
+            if found:
+                setattr(meta, field, convert(found.group(1)))
+
+
+PARSERS: List[SlicerParser] = []
+
+
+def register_parser(cls):
+    """Class decorator adding a parser to the registry (checked in order)"""
+    PARSERS.append(cls())
+    return cls
+
+
+class _BambuFamilyParser(SlicerParser):
+    """Orca and Bambu Studio report the model's printing time and a total with preparation.
+
+    The model time is preferred, since heat-up is added from the G-code
+    scan; if only the total is found, the metadata is marked accordingly.
+    """
+    total_patterns = [re.compile(r'total estimated time: ([^;\n]+)')]
+
+    def match(self, text: str, meta: GcodeMetadata):
+        super().match(text, meta)
+        if meta.print_time_h is not None:
+            return
+        for pattern in self.total_patterns:
+            found = pattern.search(text)
+            if found:
+                meta.print_time_h = parse_duration(found.group(1))
+                meta.prepare_included = True
+                return
+
+
+_MODEL_TIME = re.compile(r'model printing time: ([^;\n]+)')
+
+
+@register_parser
+class OrcaSlicerParser(_BambuFamilyParser):
+    name = 'OrcaSlicer'
+    signature = re.compile(r'generated by OrcaSlicer', re.IGNORECASE)
+    location = 'both'
+    patterns = [
+        ('print_time_h', _MODEL_TIME, parse_duration),
+        ('filament_weight_g', re.compile(r'; total filament used \[g\] = (\d+\.?\d*)'), float),
+        ('filament_weight_g', re.compile(r'; filament used \[g\] = (\d+\.?\d*)'), float)
+    ]
+    total_patterns = _BambuFamilyParser.total_patterns + [
+        re.compile(r'; estimated printing time \(normal mode\) = ([^\n]+)')]
+
+
+@register_parser
+class BambuStudioParser(_BambuFamilyParser):
+    name = 'Bambu Studio'
+    signature = re.compile(r'BambuStudio', re.IGNORECASE)
+    location = 'header'
+    patterns = [
+        ('print_time_h', _MODEL_TIME, parse_duration),
+        ('filament_weight_g', re.compile(r'; total filament weight \[g\] : (\d+\.?\d*)'), float)
+    ]
+
+
+@register_parser
+class PrusaSlicerParser(SlicerParser):
+    name = 'PrusaSlicer'
+    signature = re.compile(r'generated by PrusaSlicer', re.IGNORECASE)
+    location = 'footer'
+    patterns = [
+        ('print_time_h', re.compile(r'; estimated printing time \(normal mode\) = ([^\n]+)'), parse_duration),
+        ('filament_weight_g', re.compile(r'; total filament used \[g\] = (\d+\.?\d*)'), float),
+        ('filament_weight_g', re.compile(r'; filament used \[g\] = (\d+\.?\d*)'), float)
+    ]
+
+
+@register_parser
+class SuperSlicerParser(PrusaSlicerParser):
+    name = 'SuperSlicer'
+    signature = re.compile(r'generated by SuperSlicer', re.IGNORECASE)
+
+
+@register_parser
+class CuraParser(SlicerParser):
+    name = 'Cura'
+    signature = re.compile(r'Cura_SteamEngine|^;FLAVOR:', re.IGNORECASE | re.MULTILINE)
+    location = 'header'
+    head_size = 4 * 1024
+    patterns = [
+        ('print_time_h', re.compile(r'^;TIME:(\d+)', re.MULTILINE), lambda s: float(s) / 3600),
+        ('filament_weight_g', re.compile(r'^;Filament used: (\d+\.?\d*)m', re.MULTILINE),
+         lambda s: length_to_weight(float(s)))
+    ]
+
+
+# Fallback for unknown files: the patterns the Orca import has always used
+class GenericParser(SlicerParser):
+    name = 'Unbekannt'
+    location = 'full'
+    patterns = [
+        ('print_time_h', re.compile(r'estimated printing time = .*?(\d+h\s*\d+m)', re.IGNORECASE), parse_duration),
+        ('print_time_h', re.compile(r'; estimated printing time \(normal mode\) = (\d+h \d+m)', re.IGNORECASE), parse_duration),
+        ('print_time_h', re.compile(r'; total estimated printing time = (\d+h \d+m)', re.IGNORECASE), parse_duration),
+        ('filament_weight_g', re.compile(r'filament used = (\d+\.?\d*)g', re.IGNORECASE), float),
+        ('filament_weight_g', re.compile(r'; filament used \[g\] = (\d+\.?\d*)', re.IGNORECASE), float),
+        ('filament_weight_g', re.compile(r'; total filament used \[g\] = (\d+\.?\d*)', re.IGNORECASE), float)
+    ]
+
+
+GENERIC_PARSER = GenericParser()
+
+
+def read_head(path: str, size: int = SNIFF_SIZE) -> str:
+    with open(path, 'rb') as f:
+        return f.read(size).decode('utf-8', errors='ignore')
+
+
+def sniff_parser(head: str) -> SlicerParser:
+    """Pick the registered parser whose signature appears in the file head"""
+    for parser in PARSERS:
+        if parser.sniff(head):
+            return parser
+    return GENERIC_PARSER
+
+
+def read_metadata(path: str) -> GcodeMetadata:
+    """Read print time and filament weight with as little I/O as possible.
+
+    Only the sniffed head plus the region the parser declares is read;
+    unknown slicers fall back to a line-by-line pass over the whole file.
+    """
+    head = read_head(path)
+    parser = sniff_parser(head)
+    meta = GcodeMetadata(path, parser.name)
+
+    if parser.location == 'full':
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            for line in f:
+                if line.startswith(';'):
+                    parser.match(line, meta)
+                    if meta.complete:
+                        break
+        return meta
+
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        if parser.location in ('header', 'both'):
+            if parser.head_size > len(head) and size > len(head):
+                head = f.read(parser.head_size).decode('utf-8', errors='ignore')
+            parser.match(head, meta)
+        if parser.location in ('footer', 'both') and not meta.complete:
+            f.seek(max(size - parser.tail_size, 0))
+            parser.match(f.read().decode('utf-8', errors='ignore'), meta)
+    return meta
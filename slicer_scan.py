@@ -0,0 +1,94 @@
+import fnmatch
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+
+
+class ScanRoot:
+    def __init__(self, path: str, max_depth: Optional[int] = None, exclude: Sequence[str] = ()):
+        self.path = path
+        self.max_depth = max_depth  # None = unlimited, 0 = only the root itself
+        self.exclude = list(exclude)  # glob patterns for folder and file names
+
+    def is_excluded(self, name: str) -> bool:
+        return any(fnmatch.fnmatch(name, pattern) for pattern in self.exclude)
+
+
+class ScanResult:
+    def __init__(self):
+        self.files: List[Tuple[float, str]] = []  # (mtime, path)
+        self.dirs_scanned = 0
+        self.elapsed = 0.0
+        self.truncated = False
+
+    @property
+    def newest(self) -> Optional[str]:
+        return max(self.files)[1] if self.files else None
+
+    def status_text(self) -> str:
+        text = f"{self.dirs_scanned} Ordner, {len(self.files)} Dateien, {self.elapsed:.2f} s"
+        if self.truncated:
+            text += ", abgebrochen"
+        return text
+
+
+def _scan_root(root: ScanRoot, extensions: Tuple[str, ...], stop: threading.Event,
+               deadline: Optional[float]) -> ScanResult:
+    """Iterative scandir walk of one root, reusing each DirEntry's stat"""
+    result = ScanResult()
+    stack = [(root.path, 0)]
+    while stack:
+        if stop.is_set() or (deadline is not None and time.perf_counter() > deadline):
+            stop.set()
+            result.truncated = True
+            break
+        path, depth = stack.pop()
+        try:
+            with os.scandir(path) as it:
+                result.dirs_scanned += 1
+                for entry in it:
+                    if root.is_excluded(entry.name):
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if root.max_depth is None or depth < root.max_depth:
+                                stack.append((entry.path, depth + 1))
+                        elif entry.name.lower().endswith(extensions):
+                            result.files.append((entry.stat().st_mtime, entry.path))
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return result
+
+
+def scan_for_gcode(roots: Sequence[ScanRoot], extensions: Tuple[str, ...] = ('.gcode',),
+                   max_workers: int = 4, time_budget: Optional[float] = None) -> ScanResult:
+    """Scan all roots concurrently and merge the results.
+
+    Missing and duplicate roots are skipped. With a time budget (None =
+    unlimited), every worker stops at its next directory once the budget
+    is used up and the merged result is marked as truncated.
+    """
+    start = time.perf_counter()
+    deadline = start + time_budget if time_budget is not None else None
+    stop = threading.Event()
+    existing = []
+    seen = set()
+    for root in roots:
+        key = os.path.normcase(os.path.abspath(root.path))
+        if key not in seen and os.path.isdir(root.path):
+            seen.add(key)
+            existing.append(root)
+
+    merged = ScanResult()
+    if existing:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(existing))) as pool:
+            for partial in pool.map(lambda r: _scan_root(r, extensions, stop, deadline), existing):
+                merged.files.extend(partial.files)
+                merged.dirs_scanned += partial.dirs_scanned
+                merged.truncated = merged.truncated or partial.truncated
+    merged.elapsed = time.perf_counter() - start
+    return merged
@@ -0,0 +1,129 @@
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+PERCENTILES = [5, 25, 50, 75, 95]
+
+
+def quote_arrays(print_time, filament_weight, power_price, filament_price,
+                 quantity, profit_margin, power_consumption, failure_rate=0.0) -> Dict[str, np.ndarray]:
+    """Vectorized version of the calculator's cost formula.
+
+    Every argument may be a scalar or an array; they broadcast against
+    each other. A failure rate f means on average 1 / (1 - f) attempts per
+    successful print, so material and power are scaled by that factor.
+    """
+    attempts = 1 / (1 - np.clip(failure_rate, 0, 0.95))
+    power_costs = (np.asarray(power_consumption) / 1000) * print_time * power_price * attempts
+    filament_costs = (np.asarray(filament_weight) / 1000) * filament_price * attempts
+    total_costs = power_costs + filament_costs
+    quantity = np.maximum(quantity, 1)
+    price_per_piece = total_costs / quantity * (1 + np.asarray(profit_margin) / 100)
+    return {
+        'power_costs': power_costs,
+        'filament_costs': filament_costs,
+        'total_costs': total_costs,
+        'price_per_piece': price_per_piece,
+        'total_price': price_per_piece * quantity
+    }
+
+
+def _batches(total: int, batch_size: int) -> Iterator[slice]:
+    for start in range(0, total, batch_size):
+        yield slice(start, min(start + batch_size, total))
+
+
+def grid_sweep(ranges: Dict[str, Sequence[float]], base: Dict[str, float],
+               batch_size: int = 500_000) -> Dict[str, np.ndarray]:
+    """Evaluate the cost formula on the cartesian product of ranges.
+
+    Inputs without a range are taken from base. The grid is never
+    materialized as a meshgrid; each batch decodes its flat indices with
+    np.unravel_index. Returns the swept axes and the two price columns,
+    one entry per grid point in C order.
+    """
+    axes = {name: np.asarray(values, dtype=float) for name, values in ranges.items()}
+    shape = tuple(len(values) for values in axes.values())
+    if 0 in shape:
+        raise ValueError("Jeder Bereich braucht mindestens einen Wert")
+    total = int(np.prod(shape)) if shape else 1
+    results = {'price_per_piece': np.empty(total), 'total_price': np.empty(total)}
+
+    for batch in _batches(total, batch_size):
+        index = np.unravel_index(np.arange(batch.start, batch.stop), shape)
+        params = dict(base)
+        for (name, values), idx in zip(axes.items(), index):
+            params[name] = values[idx]
+        quote = quote_arrays(**params)
+        for key in results:
+            results[key][batch] = np.broadcast_to(quote[key], (batch.stop - batch.start,))
+
+    results.update(axes)
+    return results
+
+
+def _sample(spec, size: int, rng: np.random.Generator) -> np.ndarray:
+    kind, *args = spec
+    if kind == 'normal':
+        return rng.normal(args[0], args[1], size)
+    if kind == 'uniform':
+        return rng.uniform(args[0], args[1], size)
+    if kind == 'triangular':
+        return rng.triangular(args[0], args[1], args[2], size)
+    if kind == 'lognormal':
+        # args: median and relative spread (sigma of the underlying normal)
+        return args[0] * rng.lognormal(0.0, args[1], size)
+    raise ValueError(f"Unbekannte Verteilung: {kind}")
+
+
+def monte_carlo(distributions: Dict[str, tuple], base: Dict[str, float],
+                samples: int = 1_000_000, batch_size: int = 500_000,
+                seed: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """Sample uncertain inputs and evaluate the cost formula in batches.
+
+    distributions maps an input name to ('normal', mean, sd),
+    ('uniform', low, high), ('triangular', low, mode, high) or
+    ('lognormal', median, sigma). Sampled values are clipped at zero.
+    Every input draws from its own child stream of the seed, so with a
+    seed the results do not depend on batch_size.
+    """
+    if samples < 1:
+        raise ValueError("Mindestens eine Stichprobe nötig")
+    streams = np.random.SeedSequence(seed).spawn(len(distributions))
+    rngs = {name: np.random.default_rng(stream) for name, stream in zip(distributions, streams)}
+    results = {'price_per_piece': np.empty(samples), 'total_price': np.empty(samples)}
+
+    for batch in _batches(samples, batch_size):
+        size = batch.stop - batch.start
+        params = dict(base)
+        for name, spec in distributions.items():
+            params[name] = np.maximum(_sample(spec, size, rngs[name]), 0)
+        quote = quote_arrays(**params)
+        for key in results:
+            results[key][batch] = np.broadcast_to(quote[key], (size,))
+    return results
+
+
+def percentile_table(results: Dict[str, np.ndarray],
+                     percentiles: Sequence[float] = PERCENTILES) -> Dict[str, List[float]]:
+    """Percentiles of per-piece and total price, rounded to cents"""
+    return {
+        key: [round(float(v), 2) for v in np.percentile(results[key], percentiles)]
+        for key in ('price_per_piece', 'total_price')
+    }
+
+
+def spread(center: float, relative: float, steps: int) -> np.ndarray:
+    """Evenly spaced values within ±relative (fraction) around center"""
+    if steps <= 1 or relative <= 0:
+        return np.array([center])
+    return np.linspace(center * (1 - relative), center * (1 + relative), steps)
+
+
+def format_table(table: Dict[str, List[float]], percentiles: Sequence[float] = PERCENTILES) -> str:
+    header = "".join(f"{'P' + str(p):>10}" for p in percentiles)
+    lines = [f"{'':<16}{header}"]
+    labels = {'price_per_piece': 'VK pro Stück', 'total_price': 'Gesamtpreis'}
+    for key, values in table.items():
+        lines.append(f"{labels[key]:<16}" + "".join(f"{v:>9.2f}€" for v in values))
+    return "\n".join(lines)
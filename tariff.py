@@ -0,0 +1,154 @@
+import bisect
+import csv
+import json
+import os
+from datetime import datetime
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+
+def _to_timestamp(value) -> float:
+    """Convert a datetime, ISO string or number to a POSIX timestamp"""
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, str):
+        return datetime.fromisoformat(value.strip()).timestamp()
+    return float(value)
+
+
+class TimeOfUseTariff:
+    """Electricity tariff made of contiguous price intervals.
+
+    The constructor builds a cumulative cost curve (prefix sums of
+    price * hours) over the interval boundaries, so pricing a job is two
+    binary searches regardless of how many bands it crosses.
+    """
+
+    def __init__(self, intervals: Iterable[Tuple[object, object, float]]):
+        rows = sorted(
+            (_to_timestamp(start), _to_timestamp(end), float(price))
+            for start, end, price in intervals
+        )
+        if not rows:
+            raise ValueError("Tarif enthält keine Preisintervalle")
+
+        self.boundaries: List[float] = [rows[0][0]]
+        self.prices: List[float] = []
+        for start, end, price in rows:
+            if end <= start:
+                raise ValueError(f"Ungültiges Tarifintervall ab {datetime.fromtimestamp(start)}")
+            if start != self.boundaries[-1]:
+                raise ValueError(f"Tarif hat eine Lücke oder Überlappung bei {datetime.fromtimestamp(start)}")
+            self.boundaries.append(end)
+            self.prices.append(price)
+
+        # cumulative[i] = €/kW spent from the first boundary up to boundaries[i]
+        self.cumulative: List[float] = [0.0]
+        for i, price in enumerate(self.prices):
+            hours = (self.boundaries[i + 1] - self.boundaries[i]) / 3600
+            self.cumulative.append(self.cumulative[-1] + price * hours)
+
+    @property
+    def start(self) -> float:
+        return self.boundaries[0]
+
+    @property
+    def end(self) -> float:
+        return self.boundaries[-1]
+
+    def _curve(self, t: float) -> float:
+        """Cumulative €/kW at timestamp t (linear inside an interval)"""
+        if t < self.start or t > self.end:
+            raise ValueError(f"Zeitpunkt {datetime.fromtimestamp(t)} liegt außerhalb des Tarifs")
+        i = bisect.bisect_right(self.boundaries, t) - 1
+        if i >= len(self.prices):
+            return self.cumulative[-1]
+        return self.cumulative[i] + self.prices[i] * (t - self.boundaries[i]) / 3600
+
+    def price_at(self, when) -> float:
+        """Price in €/kWh that applies at the given time"""
+        t = _to_timestamp(when)
+        if t < self.start or t >= self.end:
+            raise ValueError(f"Zeitpunkt {datetime.fromtimestamp(t)} liegt außerhalb des Tarifs")
+        return self.prices[bisect.bisect_right(self.boundaries, t) - 1]
+
+    def energy_cost(self, start, duration_h: float, power_w: float) -> float:
+        """Cost in € of drawing power_w watts for duration_h hours from start"""
+        t0 = _to_timestamp(start)
+        t1 = t0 + duration_h * 3600
+        return (power_w / 1000) * (self._curve(t1) - self._curve(t0))
+
+    def average_price(self, start, duration_h: float) -> float:
+        """Time-weighted average €/kWh over the given window"""
+        if duration_h <= 0:
+            return self.price_at(start)
+        return self.energy_cost(start, duration_h, 1000) / duration_h
+
+    def price_jobs(self, jobs: Iterable[Tuple[object, float, float]]) -> List[float]:
+        """Price many (start, duration_h, power_w) jobs"""
+        return [self.energy_cost(start, duration, power) for start, duration, power in jobs]
+
+    def cheapest_start(self, duration_h: float, power_w: float,
+                       earliest=None, latest=None) -> Tuple[datetime, float]:
+        """Find the start time in [earliest, latest] with the lowest energy cost.
+
+        The cost of a window is piecewise linear in its start time, so the
+        minimum lies on a tariff boundary, a boundary minus the duration,
+        or one of the window ends. Only those candidates are evaluated.
+        """
+        duration_s = duration_h * 3600
+        lo = self.start if earliest is None else _to_timestamp(earliest)
+        hi = self.end - duration_s if latest is None else _to_timestamp(latest)
+        hi = min(hi, self.end - duration_s)
+        lo = max(lo, self.start)
+        if hi < lo:
+            raise ValueError("Kein Startfenster, in dem der Druck vollständig im Tarif liegt")
+
+        candidates = {lo, hi}
+        for offset in (0.0, duration_s):
+            first = bisect.bisect_left(self.boundaries, lo + offset)
+            last = bisect.bisect_right(self.boundaries, hi + offset)
+            candidates.update(b - offset for b in self.boundaries[first:last])
+
+        # Ties go to the earliest start; rounding hides prefix-sum float noise
+        scale = power_w / 1000
+        best_t = min(candidates,
+                     key=lambda s: (round(self._curve(s + duration_s) - self._curve(s), 9), s))
+        best_cost = scale * (self._curve(best_t + duration_s) - self._curve(best_t))
+        return datetime.fromtimestamp(best_t), best_cost
+
+
+def load_tariff(path: str) -> TimeOfUseTariff:
+    """Load a tariff from JSON or CSV.
+
+    JSON: list of {"start": ISO, "end": ISO, "price": €/kWh}.
+    CSV: columns start,price (optionally end); a missing end is the next
+    row's start, and the last row needs an explicit end.
+    """
+    if os.path.splitext(path)[1].lower() == '.json':
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return TimeOfUseTariff((row['start'], row['end'], row['price']) for row in data)
+
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        rows = list(csv.DictReader(f))
+    intervals = []
+    for i, row in enumerate(rows):
+        end = row.get('end') or (rows[i + 1]['start'] if i + 1 < len(rows) else None)
+        if not end:
+            raise ValueError("Letzte Tarifzeile benötigt eine Endzeit")
+        intervals.append((row['start'], end, row['price']))
+    return TimeOfUseTariff(intervals)
+
+
+def hourly_tariff(start: datetime, prices: Sequence[float]) -> TimeOfUseTariff:
+    """Build a tariff from consecutive hourly prices starting at start"""
+    t0 = start.timestamp()
+    return TimeOfUseTariff(
+        (t0 + i * 3600, t0 + (i + 1) * 3600, price) for i, price in enumerate(prices)
+    )
+
+
+def default_tariff_path(config: dict) -> Optional[str]:
+    """Return the configured tariff file if it exists"""
+    path = config.get('tariff_file', '')
+    return path if path and os.path.exists(path) else None
@@ -0,0 +1,94 @@
+import os
+import subprocess
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+from calculator_core import BatchImport, Printer, QuoteInput, power_model, quote, read_batch
+from slicer_parsers import GcodeMetadata
+from tariff import hourly_tariff
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_input(**values):
+    base = dict(print_time=4.0, filament_weight=200.0, power_consumption=150.0,
+                power_price=0.30, filament_price=25.0)
+    base.update(values)
+    return QuoteInput(**base)
+
+
+def test_quote_arithmetic():
+    result = quote(make_input(profit_margin=50, quantity=4))
+    assert result.total_kwh == pytest.approx(0.6)
+    assert result.power_costs == pytest.approx(0.18)
+    assert result.filament_costs == pytest.approx(5.0)  # weight covers all pieces
+    assert result.total_costs == pytest.approx(5.18)
+    assert result.cost_per_piece == pytest.approx(1.295)
+    assert result.profit_per_piece == pytest.approx(0.6475)
+    assert result.price_per_piece == pytest.approx(1.9425)
+    assert result.total_profit == pytest.approx(2.59)
+    assert result.final_price == pytest.approx(7.77)
+
+    row = result.as_dict()
+    assert row['quantity'] == 4 and row['power_hours'] == 4.0
+    assert row['final_price'] == pytest.approx(7.77)
+
+
+def test_power_hours_include_heatup():
+    result = quote(make_input(power_hours=4.5))
+    assert result.power_hours == 4.5
+    assert result.total_kwh == pytest.approx(0.675)
+
+
+def test_measured_energy_replaces_wattage():
+    result = quote(make_input(measured_kwh=1.2))
+    assert result.total_kwh == pytest.approx(1.2)
+    assert result.input.power_consumption == 150  # the input is left alone
+    assert result.power_costs == pytest.approx(0.36)
+
+
+def test_tariff_and_fallback():
+    start = datetime(2026, 3, 1, 0, 0)
+    tariff = hourly_tariff(start, [0.40, 0.40, 0.10, 0.10, 0.10, 0.10, 0.40, 0.40])
+    inside = quote(make_input(print_time=2, start=start), tariff)
+    assert inside.power_costs == pytest.approx(0.15 * 2 * 0.40)
+    assert inside.cheapest_start == (start + timedelta(hours=2), pytest.approx(0.15 * 2 * 0.10))
+
+    # The job does not fit into the tariff: flat price, no suggestion
+    outside = quote(make_input(print_time=2, start=start + timedelta(hours=7)), tariff)
+    assert outside.power_costs == pytest.approx(0.15 * 2 * 0.30)
+    assert outside.cheapest_start is None
+
+
+def test_power_model_without_scan():
+    assert power_model(Printer('P', 150), 3.0) == (150, 3.0)
+
+
+def test_read_batch(tmp_path):
+    good = tmp_path / 'a.gcode'
+    good.write_text(';FLAVOR:Marlin\n;TIME:3600\n;Filament used: 1m\n', encoding='ascii')
+    partial = tmp_path / 'b.gcode'
+    partial.write_text(';FLAVOR:Marlin\n;TIME:1800\n', encoding='ascii')
+    missing = str(tmp_path / 'missing.gcode')
+
+    batch = read_batch([str(good), str(partial), missing])
+    assert isinstance(batch, BatchImport)
+    assert batch.print_time_h == pytest.approx(1.5)
+    assert batch.filament_weight_g == pytest.approx(batch.files[0].filament_weight_g)
+    assert batch.unreadable == [missing]
+    assert batch.incomplete == [missing, str(partial)]
+    assert batch.slicer_counts() == {'Cura': 2}
+
+
+def test_batch_of_nothing():
+    batch = BatchImport(files=[GcodeMetadata('x', 'Cura')])
+    assert batch.print_time_h == 0 and batch.filament_weight_g == 0
+
+
+def test_import_does_not_load_tkinter():
+    code = "import sys, calculator_core; print('tkinter' in sys.modules)"
+    output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True,
+                            text=True, check=True).stdout
+    assert output.strip() == 'False'
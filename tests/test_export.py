@@ -0,0 +1,64 @@
+import csv
+import json
+
+import pytest
+
+from calculator_core import Printer
+from export import QUOTE_FIELDS, export_rows
+from printer_io import export_printers, import_printers
+
+ROWS = [
+    {'name': 'A', 'print_time': 1.5, 'quantity': 2, 'total_costs': 3.0,
+     'price_per_piece': 2.0, 'final_price': 4.0},
+    {'name': 'B', 'print_time': 0.5, 'quantity': 1, 'total_costs': 1.0,
+     'price_per_piece': 1.5, 'final_price': 1.5},
+]
+
+
+def test_csv_and_jsonl(tmp_path):
+    assert export_rows(iter(ROWS), str(tmp_path / 'a.csv'), fields=QUOTE_FIELDS) == 2
+    with open(tmp_path / 'a.csv', encoding='utf-8', newline='') as f:
+        assert [row['name'] for row in csv.DictReader(f, delimiter=';')] == ['A', 'B']
+
+    export_rows(iter(ROWS), str(tmp_path / 'a.jsonl'))
+    lines = (tmp_path / 'a.jsonl').read_text(encoding='utf-8').splitlines()
+    assert [json.loads(line)['name'] for line in lines] == ['A', 'B']
+
+
+@pytest.mark.parametrize('rows', [ROWS, []])
+def test_json_is_an_array(tmp_path, rows):
+    path = tmp_path / 'a.json'
+    assert export_rows(iter(rows), str(path), fields=['name', 'total_costs']) == len(rows)
+    assert json.loads(path.read_text(encoding='utf-8')) == \
+        [{'name': row['name'], 'total_costs': row['total_costs']} for row in rows]
+
+
+def test_printers_round_trip_through_json(tmp_path):
+    path = str(tmp_path / 'printers.json')
+    export_printers([Printer('Prusa', 120, idle_power=10), Printer('Ender', 200)], path)
+    result = import_printers(path)
+    assert not result.errors
+    assert [(p.name, p.power_consumption, p.idle_power) for p in result.printers] == \
+        [('Prusa', 120, 10), ('Ender', 200, None)]
+
+
+def test_html_totals_only_additive_columns(tmp_path):
+    path = tmp_path / 'a.html'
+    export_rows(iter(ROWS), str(path), fields=QUOTE_FIELDS, page_size=1)
+    text = path.read_text(encoding='utf-8')
+    assert text.count('class="page"') == 2
+    summary = text.split('<h2>Summe (2 Positionen)</h2>')[1]
+    cells = summary.split('<tr>')[2].split('</tr>')[0]
+    values = [cell[len('<td>'):] for cell in cells.split('</td>')[:-1]]
+    totals = dict(zip(QUOTE_FIELDS, values))
+    assert totals['print_time'] == '2.00'
+    assert totals['quantity'] == '3.00'
+    assert totals['total_costs'] == '4.00'
+    assert totals['final_price'] == '5.50'
+    assert totals['price_per_piece'] == ''
+    assert totals['name'] == ''
+
+
+def test_unknown_extension(tmp_path):
+    with pytest.raises(ValueError):
+        export_rows(iter(ROWS), str(tmp_path / 'a.xlsx'))
@@ -0,0 +1,73 @@
+import pytest
+
+from calculator_core import Printer, power_model
+from gcode_phases import AMBIENT_TEMP, BED_RATE, HOTEND_RATE, PowerProfile, scan_gcode
+from gcode_stats import scan_large_gcode
+
+PROFILE = PowerProfile(200, heatup=400, idle=50)
+
+
+def fixture(tmp_path, body, name='part.gcode'):
+    lines = [
+        '; generated by PrusaSlicer 2.7.1',
+        'M140 S60',
+        'M190 S60',  # bed 25 -> 60 °C
+        'M104 S215',
+        'M109 S215',  # hotend 25 -> 215 °C
+        'G4 S10',  # purge pause before printing: idle
+        'G28',
+        'G1 X10 Y10 E2 F1200',
+    ] + body + [
+        '; estimated printing time (normal mode) = 1h 30m 0s',
+        '; filament used [g] = 25.5',
+    ]
+    path = tmp_path / name
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    return str(path)
+
+
+def test_heatup_of_blocking_waits(tmp_path):
+    scan = scan_gcode(fixture(tmp_path, []), PROFILE)
+    expected = (60 - AMBIENT_TEMP) / PROFILE.bed_rate + (215 - AMBIENT_TEMP) / PROFILE.hotend_rate
+    assert scan.heatup_s == pytest.approx(expected)
+    assert scan.print_time_h == pytest.approx(1.5)
+    assert scan.filament_weight_g == pytest.approx(25.5)
+
+
+def test_dwells_while_printing_are_part_of_print_time(tmp_path):
+    body = ['G4 S30', 'G4 P5000', 'G40', 'G1 X20 E1']
+    scan = scan_gcode(fixture(tmp_path, body), PROFILE)
+    assert scan.idle_s == pytest.approx(10)
+    assert not scan.cooled_down
+
+
+def test_cooldown_and_phase_energy(tmp_path):
+    scan = scan_gcode(fixture(tmp_path, ['G1 X20 E1', 'M104 S0', 'M140 S0']), PROFILE)
+    assert scan.cooled_down
+    assert [phase.name for phase in scan.phases] == ['heatup', 'idle', 'printing', 'cooldown']
+
+    expected = (400 * scan.heatup_s / 3600 + 50 * 10 / 3600 + 200 * 1.5
+                + 50 * PROFILE.cooldown_minutes / 60) / 1000
+    assert scan.energy_kwh() == pytest.approx(expected)
+    assert sum(scan.summary().values()) == pytest.approx(expected, abs=1e-3)
+
+    power_w, power_hours = power_model(Printer('P', 200, 400, 50), 1.5, scan)
+    assert power_hours == pytest.approx(1.5 + scan.overhead_h())
+    assert power_w * power_hours / 1000 == pytest.approx(expected)
+
+
+def test_large_file_scan_agrees(tmp_path):
+    path = fixture(tmp_path, ['G4 S30', 'G1 X20 E1', 'M104 S0'])
+    small = scan_gcode(path, PROFILE)
+    large = scan_large_gcode(path, PROFILE, workers=1)
+    assert large.heatup_s == pytest.approx(small.heatup_s)
+    assert large.idle_s == pytest.approx(small.idle_s) == pytest.approx(10)
+    assert large.cooled_down == small.cooled_down
+
+
+def test_default_wattages_and_rates():
+    profile = PowerProfile(100)
+    assert (profile.heatup, profile.idle) == (200, 30)
+    assert (profile.bed_rate, profile.hotend_rate) == (BED_RATE, HOTEND_RATE)
+    printer = Printer('P', 100, extra={'bed_rate': 1.5})
+    assert printer.power_profile().bed_rate == 1.5
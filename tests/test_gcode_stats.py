@@ -0,0 +1,70 @@
+import math
+
+import pytest
+
+from gcode_stats import _range_modes, gcode_statistics
+
+
+def write(path, lines):
+    path.write_bytes(('\n'.join(lines) + '\n').encode('ascii'))
+    return str(path)
+
+
+@pytest.mark.parametrize('line, modes', [
+    ('G91', (False, False)),
+    ('g91', (False, False)),
+    ('  G91 ; relative', (False, False)),
+    ('G91;relative', (False, False)),
+    ('G91.1', (None, None)),
+    ('G910', (None, None)),
+    ('; G91', (None, None)),
+    ('m83', (None, False)),
+    ('G91\r', (False, False)),
+])
+def test_range_modes(tmp_path, line, modes):
+    path = write(tmp_path / 'a.gcode', ['G1 X1', line, 'G1 X2'])
+    assert _range_modes(path, 0, len(open(path, 'rb').read())) == modes
+
+
+def test_ranges_agree_with_single_pass(tmp_path):
+    lines = ['G90', 'M82', 'G92 E0']
+    for layer in range(200):
+        lines.append(';LAYER_CHANGE')
+        lines.append('G91.1' if layer % 3 == 0 else 'm83' if layer % 3 == 1 else '  G90')
+        lines.append('M82' if layer % 3 != 1 else '; G91')
+        lines += [f'G1 X{i % 50} Y{layer % 7} E{0.5 * (i + 1)}' for i in range(20)]
+        lines.append('g91' if layer % 5 == 0 else 'G90')
+        lines.append('G1 X5 Y5')
+        lines.append('G90')
+    path = write(tmp_path / 'big.gcode', lines)
+
+    single = gcode_statistics(path, workers=1)
+    parallel = gcode_statistics(path, workers=4, min_range_size=1024)
+    assert parallel.layers == single.layers == 200
+    assert parallel.moves == single.moves
+    assert parallel.extrusion_mm == pytest.approx(single.extrusion_mm)
+    assert parallel.travel_mm == pytest.approx(single.travel_mm)
+
+
+def test_arcs_extrude_and_move(tmp_path):
+    path = write(tmp_path / 'arcs.gcode', [
+        'G90', 'M83', 'G92 E0',
+        'G1 X0 Y0 E1',
+        'G2 X10 Y0 I5 J0 E2.5',  # half circle, relative E
+        'G3 X0 Y0 I-5 J0 E2.5',
+        'G1 X10 Y0',  # travel of 10 mm from the arc's end point
+    ])
+    stats = gcode_statistics(path, workers=1)
+    assert stats.moves == 4
+    assert stats.extrusion_mm == pytest.approx(6)
+    assert stats.travel_mm == pytest.approx(10)
+
+
+def test_homing_single_axis(tmp_path):
+    path = write(tmp_path / 'home.gcode', [
+        'G90', 'G1 X50 Y50 Z5',
+        'G28 X',  # only X is homed; Y and Z keep their position
+        'G1 X10 Y50 Z5',
+    ])
+    stats = gcode_statistics(path, workers=1)
+    assert stats.travel_mm == pytest.approx(math.hypot(50, 50) + 10)
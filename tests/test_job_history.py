@@ -0,0 +1,167 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from job_history import HistorySource, JobHistoryImporter, make_source
+from settings import Settings
+
+T0 = 1_760_000_000.0
+
+
+def moonraker_jobs(count, in_progress_at=None):
+    jobs = []
+    for i in range(count):
+        jobs.append({
+            'job_id': f'{i:06X}',
+            'filename': f'part_{i}.gcode',
+            'start_time': T0 + i * 3600,
+            'print_duration': 1800.0,
+            'filament_used': 1000.0,
+            'status': 'in_progress' if i == in_progress_at else 'completed'
+        })
+    return jobs
+
+
+def octoprint_files(count):
+    files = [{
+        'name': f'part_{i}.gcode',
+        'path': f'folder/part_{i}.gcode',
+        'type': 'machinecode',
+        'gcodeAnalysis': {'filament': {'tool0': {'length': 2000.0}}},
+        'prints': {'last': {'date': T0 + i * 3600, 'printTime': 900.0, 'success': True}}
+    } for i in range(count)]
+    # Never printed files have no statistics and are skipped
+    files.append({'name': 'new.gcode', 'path': 'new.gcode', 'type': 'machinecode'})
+    return [{'name': 'folder', 'type': 'folder', 'children': files[:-1]}, files[-1]]
+
+
+class StandIn:
+    """Minimal Moonraker/OctoPrint endpoints on localhost, counting requests"""
+
+    def __init__(self, jobs=(), files=()):
+        self.jobs = list(jobs)
+        self.files = list(files)
+        self.requests = []
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = {key: values[0] for key, values in parse_qs(url.query).items()}
+                stand_in.requests.append((url.path, query))
+                if url.path == '/server/history/list':
+                    since = float(query.get('since', 0))
+                    start = int(query.get('start', 0))
+                    limit = int(query.get('limit', 50))
+                    jobs = [job for job in stand_in.jobs if job['start_time'] > since]
+                    body = {'result': {'count': len(jobs), 'jobs': jobs[start:start + limit]}}
+                elif url.path == '/api/files':
+                    body = {'files': stand_in.files}
+                else:
+                    self.send_error(404)
+                    return
+                data = json.dumps(body).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def settings(tmp_path):
+    return Settings(str(tmp_path))
+
+
+def test_history_source_is_abstract():
+    with pytest.raises(TypeError):
+        HistorySource('http://localhost')
+
+
+def test_moonraker_paging(settings):
+    with StandIn(jobs=moonraker_jobs(250)) as server:
+        source = make_source('moonraker', server.url)
+        with JobHistoryImporter(settings, page_size=100) as importer:
+            records = importer.sync(source)
+    assert len(records) == 250
+    assert [record.job_id for record in records] == [f'{i:06X}' for i in range(250)]
+    assert [query['start'] for _, query in server.requests] == ['0', '100', '200']
+    assert records[0].print_time_h == pytest.approx(0.5)
+    assert records[0].filament_weight_g == pytest.approx(2.98, abs=0.01)
+
+
+def test_moonraker_stops_at_job_in_progress(settings):
+    with StandIn(jobs=moonraker_jobs(10, in_progress_at=6)) as server:
+        source = make_source('moonraker', server.url)
+        with JobHistoryImporter(settings, page_size=4) as importer:
+            records = importer.sync(source)
+            importer.commit(source, records)
+
+            # Once the job has finished, the next sync picks it up
+            server.jobs[6]['status'] = 'completed'
+            later = importer.sync(source)
+    assert [record.job_id for record in records] == [f'{i:06X}' for i in range(6)]
+    assert [record.job_id for record in later] == [f'{i:06X}' for i in range(6, 10)]
+
+
+def test_cursor_resumes_only_after_commit(settings):
+    with StandIn(jobs=moonraker_jobs(30)) as server:
+        source = make_source('moonraker', server.url)
+        with JobHistoryImporter(settings, page_size=10) as importer:
+            first = importer.sync(source)
+            # Not committed (e.g. the export failed): the same jobs come again
+            assert importer.sync(source) == first
+            assert importer.cursor(source) == 0
+
+            assert importer.commit(source, first[:12]) == first[11].start_time
+            rest = importer.sync(source)
+        assert [record.job_id for record in rest] == [record.job_id for record in first[12:]]
+        assert server.requests[-1][1]['since'] == str(first[11].start_time)
+
+    # The cursor is stored in job_sync.json and survives a restart
+    reloaded = Settings(settings.directory)
+    assert reloaded.get('sync') == {source.key: first[11].start_time}
+
+
+def test_full_sync_ignores_cursor(settings):
+    with StandIn(jobs=moonraker_jobs(5)) as server:
+        source = make_source('moonraker', server.url)
+        with JobHistoryImporter(settings) as importer:
+            importer.commit(source, importer.sync(source))
+            assert importer.sync(source) == []
+            assert len(importer.sync(source, full=True)) == 5
+
+
+def test_octoprint_batches(settings):
+    with StandIn(files=octoprint_files(25)) as server:
+        source = make_source('octoprint', server.url, api_key='secret')
+        with JobHistoryImporter(settings, page_size=10) as importer:
+            pages = list(source.pages(importer.session, since=0, page_size=10))
+            assert [len(page) for page in pages] == [10, 10, 5]
+            assert len(server.requests) == 1
+
+            importer.commit(source, [record for page in pages for record in page][:20])
+            rest = importer.sync(source)
+    assert [record.filename for record in rest] == [f'part_{i}.gcode' for i in range(20, 25)]
+    assert rest[0].job_id == 'folder/part_20.gcode'
+    assert rest[0].print_time_h == pytest.approx(0.25)
@@ -0,0 +1,68 @@
+import os
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from calculator_core import QuoteInput, quote
+from power_log import PowerSeries, PowerStore
+
+START = datetime(2026, 3, 1, 12, 0)
+
+
+def write_log(path, seconds, watts):
+    t0 = START.timestamp()
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('timestamp;power\n')
+        for second, power in zip(seconds, watts):
+            f.write(f'{t0 + second};{power}\n')
+
+
+def test_energy_matches_trapezoid():
+    t = np.arange(0, 3600, 1.0) + START.timestamp()
+    w = (100 + 50 * np.sin(np.arange(3600) / 300)).astype(np.float32)
+    series = PowerSeries(t, w)
+    kwh, covered = series.energy(t[0], t[-1])
+    assert kwh[0] == pytest.approx(np.trapezoid(w.astype(np.float64), t) / 3.6e6)
+    assert covered[0] == pytest.approx(t[-1] - t[0])
+
+
+def test_gap_is_scaled_to_the_full_window(tmp_path):
+    # 200 W for one hour, with 5 of the 60 minutes missing from the log
+    seconds = [s for s in range(0, 3601, 10) if not 1800 < s < 2100]
+    write_log(tmp_path / 'plug.csv', seconds, [200] * len(seconds))
+    store = PowerStore(str(tmp_path / 'store'))
+    store.ingest('Prusa', [str(tmp_path / 'plug.csv')])
+
+    reading = store.measured_energy('Prusa', START, 1.0)
+    assert reading.coverage == pytest.approx(55 / 60, abs=0.01)
+    assert reading.kwh == pytest.approx(0.2 * reading.coverage, rel=0.01)
+    assert reading.mean_watts == pytest.approx(200)
+    assert reading.window_kwh == pytest.approx(0.2)
+
+    result = quote(QuoteInput(print_time=1.0, filament_weight=0, power_consumption=50,
+                              power_price=0.3, filament_price=0,
+                              measured_kwh=reading.window_kwh))
+    assert result.total_kwh == pytest.approx(0.2)
+    assert result.power_costs == pytest.approx(0.06)
+
+
+def test_poor_coverage_falls_back(tmp_path):
+    seconds = list(range(0, 1800, 10))
+    write_log(tmp_path / 'plug.csv', seconds, [150] * len(seconds))
+    store = PowerStore(str(tmp_path / 'store'))
+    store.ingest('Prusa', [str(tmp_path / 'plug.csv')])
+    assert store.measured_energy('Prusa', START, 1.0) is None
+
+
+def test_ingest_merges_and_deduplicates(tmp_path):
+    write_log(tmp_path / 'a.csv', range(0, 100), [100] * 100)
+    write_log(tmp_path / 'b.csv', range(50, 150), [100] * 100)
+    store = PowerStore(str(tmp_path / 'store'))
+    assert store.ingest('Prusa', [str(tmp_path / 'a.csv')]) == 100
+    assert store.ingest('Prusa', [str(tmp_path / 'b.csv')]) == 150
+    assert [path.name for path in (tmp_path / 'store').iterdir()] == \
+        [os.path.basename(store._base('Prusa')) + '.npy']
+    series = PowerStore(str(tmp_path / 'store')).series('Prusa')
+    assert len(series) == 150
+    assert np.all(np.diff(series.timestamps) > 0)
@@ -0,0 +1,50 @@
+import pytest
+
+from calculator_core import Printer
+from printer_io import export_printers, import_printers, merge_printers, validate_printer
+
+
+@pytest.mark.parametrize('value', ['nan', 'NaN', 'inf', '-inf', 'Infinity', float('nan'), float('inf')])
+def test_non_finite_power_is_rejected(value):
+    with pytest.raises(ValueError):
+        validate_printer({'name': 'Prusa', 'power_consumption': value})
+    with pytest.raises(ValueError):
+        validate_printer({'name': 'Prusa', 'power_consumption': 120, 'idle_power': value})
+
+
+def test_non_finite_extra_fields_stay_strings():
+    printer = validate_printer({'name': 'Prusa', 'power_consumption': '120,5',
+                                'default_speed': '60', 'note': 'inf', 'nozzle': 'nan'})
+    assert printer.power_consumption == 120.5
+    assert printer.extra == {'default_speed': 60.0, 'note': 'inf', 'nozzle': 'nan'}
+
+
+def test_import_collects_row_errors(tmp_path):
+    path = tmp_path / 'printers.csv'
+    path.write_text('name;power_consumption\nPrusa;120\nEnder;nan\nPrusa;100\n;80\n', encoding='utf-8')
+    result = import_printers(str(path))
+    assert [printer.name for printer in result.printers] == ['Prusa']
+    assert [error.line for error in result.errors] == [3, 4, 5]
+
+
+def test_merge_keeps_fields_the_import_does_not_mention(tmp_path):
+    printers = [Printer('Prusa', 120, idle_power=15, extra={'default_speed': 60.0}),
+                Printer('Ender', 200)]
+    path = tmp_path / 'printers.csv'
+    path.write_text('name;power_consumption;nozzle\nPrusa;130;0.6\nVoron;350;0.4\n', encoding='utf-8')
+
+    assert merge_printers(printers, import_printers(str(path)).printers) == (1, 1)
+    prusa = printers[0]
+    assert prusa.power_consumption == 130
+    assert prusa.idle_power == 15
+    assert prusa.extra == {'default_speed': 60.0, 'nozzle': 0.6}
+    assert [printer.name for printer in printers] == ['Prusa', 'Ender', 'Voron']
+
+
+def test_extra_fields_round_trip(tmp_path):
+    path = str(tmp_path / 'printers.csv')
+    export_printers([Printer('Prusa', 120, extra={'default_speed': 60.0})], path)
+    printers = [Printer('Prusa', 100, extra={'default_speed': 40.0})]
+    merge_printers(printers, import_printers(path).printers)
+    assert printers[0].power_consumption == 120
+    assert printers[0].extra == {'default_speed': 60.0}
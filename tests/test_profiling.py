@@ -0,0 +1,120 @@
+import argparse
+import importlib
+import os
+import sys
+import tracemalloc
+
+import pytest
+
+import profiling
+from profiling import Profiler
+
+cli = importlib.import_module('3d_print_calculator')
+gui = importlib.import_module('3d_print_calculator_gui')
+
+
+@pytest.fixture(autouse=True)
+def stop_tracing():
+    yield
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def allocate(size):
+    return [bytearray(1024) for _ in range(size)]
+
+
+class Owner:
+    def method(self):
+        return allocate(10)
+
+
+class Child(Owner):
+    pass
+
+
+def test_section_writes_stats_and_snapshot(tmp_path):
+    profiler = Profiler(str(tmp_path))
+    profiled = profiler.wrap(allocate, 'allocate')
+    assert len(profiled(2000)) == 2000
+    profiled(10)
+
+    summary = profiler.finish()
+    assert os.path.isfile(os.path.join(profiler.directory, 'allocate.pstats'))
+    assert os.path.isfile(os.path.join(profiler.directory, 'memory.snapshot'))
+    section = profiler.sections['allocate']
+    assert section.calls == 2
+    assert section.peak_bytes > 2000 * 1024
+    assert 'allocate: 2 Aufrufe' in summary
+    assert profiler.finish() == ''
+
+
+def test_nested_calls_count_under_the_outer_section(tmp_path):
+    profiler = Profiler(str(tmp_path))
+    inner = profiler.wrap(allocate, 'inner')
+    outer = profiler.wrap(lambda: inner(5), 'outer')
+    outer()
+    profiler.finish()
+    assert profiler.sections['inner'].calls == 1
+    assert profiler.sections['inner'].seconds == 0
+    assert os.path.isfile(os.path.join(profiler.directory, 'outer.pstats'))
+
+
+def test_finish_restores_patched_attributes(tmp_path):
+    module = sys.modules[__name__]
+    original_method, original_function = Owner.method, module.allocate
+    profiler = Profiler(str(tmp_path))
+    profiler.patch(Owner, 'method')
+    profiler.patch(Child, 'method', 'child_method')
+    profiler.patch(module, 'allocate')
+    assert Owner.method is not original_method
+    assert 'method' in vars(Child)
+
+    Child().method()
+    profiler.finish()
+    assert Owner.method is original_method
+    assert 'method' not in vars(Child)  # inherited again
+    assert module.allocate is original_function
+    assert profiler.sections['child_method'].calls == 1
+
+
+def test_cli_profile_session(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sys, 'argv', ['3d_print_calculator.py', '--profile', '--profile-dir', str(tmp_path)])
+    monkeypatch.setattr('builtins.input', lambda prompt='': '7')
+    originals = cli.PrintCalculator.calculate_costs, cli.schedule_jobs, cli.export_rows
+
+    cli.main()
+    assert (cli.PrintCalculator.calculate_costs, cli.schedule_jobs, cli.export_rows) == originals
+    assert '=== Profil' in capsys.readouterr().out
+    sessions = [entry for entry in tmp_path.iterdir() if (entry / 'memory.snapshot').is_file()]
+    assert len(sessions) == 1
+
+
+def test_gui_profile_session(tmp_path, monkeypatch, capsys):
+    originals = {name: vars(gui.PrintCalculatorGUI)[name]
+                 for name in ('import_from_orca', 'import_gcode_batch', 'calculate_costs')}
+    find_latest_gcode = gui.find_latest_gcode
+    during = {}
+
+    class Root:
+        def mainloop(self):
+            during['scan'] = gui.find_latest_gcode
+            during['methods'] = {name: vars(gui.PrintCalculatorGUI)[name] for name in originals}
+
+    monkeypatch.setattr(sys, 'argv', ['3d_print_calculator_gui.py', '--profile', '--profile-dir', str(tmp_path)])
+    monkeypatch.setattr(gui.tk, 'Tk', Root)
+    monkeypatch.setattr(gui.PrintCalculatorGUI, '__init__', lambda self, root: None)
+
+    gui.main()
+    assert during['scan'].__wrapped__ is find_latest_gcode
+    assert all(during['methods'][name].__wrapped__ is original for name, original in originals.items())
+    assert gui.find_latest_gcode is find_latest_gcode
+    assert {name: vars(gui.PrintCalculatorGUI)[name] for name in originals} == originals
+    assert '=== Profil' in capsys.readouterr().out
+
+
+def test_no_profiler_without_flag():
+    parser = argparse.ArgumentParser()
+    profiling.add_profile_arguments(parser)
+    assert profiling.start_profiler(parser.parse_args([])) is None
@@ -0,0 +1,37 @@
+import pytest
+
+from scheduler import Job, schedule_jobs
+
+PRINTERS = {'Prusa': 100, 'Ender': 300}
+
+
+def jobs(count=8, hours=0.5):
+    return [Job(f'job_{i}', hours) for i in range(count)]
+
+
+def test_makespan_balances_queues():
+    schedule = schedule_jobs(jobs(), PRINTERS, 0.3)
+    assert schedule.makespan == pytest.approx(2.0)
+    assert schedule.summary()['Prusa']['jobs'] == 4
+
+
+def test_cost_mode_without_slack_keeps_balanced_plan():
+    balanced = schedule_jobs(jobs(), PRINTERS, 0.3)
+    cost = schedule_jobs(jobs(), PRINTERS, 0.3, objective='cost', slack=0)
+    assert cost.makespan == pytest.approx(balanced.makespan)
+    assert cost.total_costs == pytest.approx(balanced.total_costs)
+
+
+def test_slack_trades_makespan_for_costs():
+    balanced = schedule_jobs(jobs(), PRINTERS, 0.3)
+    cost = schedule_jobs(jobs(), PRINTERS, 0.3, objective='cost')
+    assert cost.total_costs < balanced.total_costs
+    assert balanced.makespan < cost.makespan <= balanced.makespan * 1.25 + 1e-9
+
+    unlimited = schedule_jobs(jobs(), PRINTERS, 0.3, objective='cost', max_makespan=10)
+    assert unlimited.summary()['Ender']['jobs'] == 0
+
+
+def test_negative_slack_is_rejected():
+    with pytest.raises(ValueError):
+        schedule_jobs(jobs(), PRINTERS, 0.3, objective='cost', slack=-0.1)
@@ -0,0 +1,85 @@
+import os
+import time
+
+import pytest
+
+import settings as settings_module
+from settings import STALE_LOCK_AGE, Settings
+
+
+def touch_later(path):
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def test_changed_is_false_for_unloaded_files(tmp_path):
+    (tmp_path / 'calculator_config.ini').write_text('[OrcaSlicer]\npath = C:/Orca\n', encoding='utf-8')
+    settings = Settings(str(tmp_path))
+    assert not settings.changed('ini')
+    assert not settings.changed('ini')
+    assert not settings.changed('config')  # missing file
+    assert settings.orca_path == 'C:/Orca'
+
+
+def test_changed_after_external_edit(tmp_path):
+    path = tmp_path / 'config.json'
+    path.write_text('{"theme": "dark"}', encoding='utf-8')
+    settings = Settings(str(tmp_path))
+    assert settings.get('config') == {'theme': 'dark'}
+
+    other = Settings(str(tmp_path))
+    other.set('config', {'theme': 'light'})
+    other.flush()
+    touch_later(path)
+    assert settings.changed('config')
+    assert settings.get('config') == {'theme': 'light'}
+    assert not settings.changed('config')
+
+
+def test_get_returns_a_copy(tmp_path):
+    settings = Settings(str(tmp_path))
+    settings.set('printers', [{'name': 'Prusa', 'power_consumption': 120}])
+    printers = settings.get('printers')
+    printers[0]['power_consumption'] = 999
+    printers.append({'name': 'Ender', 'power_consumption': 200})
+    assert settings.get('printers') == [{'name': 'Prusa', 'power_consumption': 120}]
+    assert Settings(str(tmp_path)).get('printers') == [{'name': 'Prusa', 'power_consumption': 120}]
+
+
+def make_stale(path):
+    path.write_text('1', encoding='utf-8')
+    old = time.time() - STALE_LOCK_AGE - 10
+    os.utime(path, (old, old))
+
+
+def test_stale_lock_is_taken_over(tmp_path):
+    lock = tmp_path / '.settings.lock'
+    make_stale(lock)
+    settings = Settings(str(tmp_path))
+    settings.update('config', theme='dark')
+    assert not lock.exists()
+    assert Settings(str(tmp_path)).get('config') == {'theme': 'dark'}
+
+
+def test_fresh_lock_survives_a_late_stale_check(tmp_path):
+    lock = tmp_path / '.settings.lock'
+    make_stale(lock)
+    stale = os.stat(lock)
+    # Another instance already replaced the stale lock with its own
+    os.remove(lock)
+    lock.write_text('2', encoding='utf-8')
+
+    Settings(str(tmp_path))._remove_stale_lock(str(lock), stale)
+    assert lock.read_text(encoding='utf-8') == '2'
+    assert [path.name for path in tmp_path.iterdir()] == ['.settings.lock']
+
+
+def test_lock_excludes_other_instances(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings_module, 'LOCK_TIMEOUT', 0.2)
+    first, second = Settings(str(tmp_path)), Settings(str(tmp_path))
+    with first._lock():
+        with pytest.raises(TimeoutError):
+            with second._lock():
+                pass
+    with second._lock():
+        pass
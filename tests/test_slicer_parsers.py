@@ -0,0 +1,96 @@
+import pytest
+
+from gcode_phases import PowerProfile, scan_gcode
+from slicer_parsers import SNIFF_SIZE, length_to_weight, parse_duration, read_metadata, sniff_parser
+
+BODY = ['G1 X10 Y10 E1'] * 200
+
+FIXTURES = {
+    'OrcaSlicer': (
+        ['; HEADER_BLOCK_START', '; generated by OrcaSlicer 2.1.1 on 2026-03-01 at 12:00:00',
+         '; model printing time: 1h 30m 0s; total estimated time: 1h 36m 0s', '; HEADER_BLOCK_END'],
+        ['; filament used [mm] = 8000.00', '; total filament used [g] = 24.20',
+         '; estimated printing time (normal mode) = 1h 36m 0s'],
+        1.5, 24.2),
+    'Bambu Studio': (
+        ['; HEADER_BLOCK_START', '; BambuStudio 01.09.00.70',
+         '; model printing time: 2h 0m 0s; total estimated time: 2h 7m 30s',
+         '; total filament weight [g] : 31.05', '; HEADER_BLOCK_END'],
+        [],
+        2.0, 31.05),
+    'PrusaSlicer': (
+        ['; generated by PrusaSlicer 2.7.1+win64 on 2026-03-01 at 12:00:00 UTC'],
+        ['; filament used [mm] = 5000.00', '; filament used [g] = 15.00',
+         '; estimated printing time (normal mode) = 1d 2h 3m 4s'],
+        26 + 3 / 60 + 4 / 3600, 15.0),
+    'SuperSlicer': (
+        ['; generated by SuperSlicer 2.5.59 on 2026-03-01 at 12:00:00 UTC'],
+        ['; total filament used [g] = 9.50', '; estimated printing time (normal mode) = 45m 10s'],
+        45 / 60 + 10 / 3600, 9.5),
+    'Cura': (
+        [';FLAVOR:Marlin', ';TIME:5400', ';Filament used: 2.5m', ';Generated with Cura_SteamEngine 5.6.0'],
+        [],
+        1.5, length_to_weight(2.5)),
+    'Unbekannt': (
+        ['; some other slicer'],
+        ['; estimated printing time = 3h 15m', '; filament used = 40.5g'],
+        3.25, 40.5),
+}
+
+
+def write(tmp_path, header, footer, body=BODY, name='part.gcode'):
+    path = tmp_path / name
+    path.write_text('\n'.join(header + body + footer) + '\n', encoding='utf-8')
+    return str(path)
+
+
+@pytest.mark.parametrize('slicer', list(FIXTURES))
+def test_metadata_of_each_slicer(tmp_path, slicer):
+    header, footer, hours, grams = FIXTURES[slicer]
+    meta = read_metadata(write(tmp_path, header, footer))
+    assert meta.slicer == slicer
+    assert meta.print_time_h == pytest.approx(hours)
+    assert meta.filament_weight_g == pytest.approx(grams)
+    assert meta.complete
+    assert not meta.prepare_included
+
+
+@pytest.mark.parametrize('slicer', list(FIXTURES))
+def test_scan_reads_the_same_metadata(tmp_path, slicer):
+    header, footer, hours, grams = FIXTURES[slicer]
+    scan = scan_gcode(write(tmp_path, header, footer), PowerProfile(200))
+    assert scan.slicer == slicer
+    assert scan.print_time_h == pytest.approx(hours)
+    assert scan.filament_weight_g == pytest.approx(grams)
+
+
+def test_orca_total_time_includes_heatup(tmp_path):
+    header = ['; generated by OrcaSlicer 2.1.1', 'M190 S60']
+    footer = ['; total filament used [g] = 24.20', '; estimated printing time (normal mode) = 1h 36m 0s']
+    path = write(tmp_path, header, footer)
+    meta = read_metadata(path)
+    assert meta.print_time_h == pytest.approx(1.6)
+    assert meta.prepare_included
+
+    scan = scan_gcode(path, PowerProfile(200))
+    assert scan.prepare_included and scan.heatup_s > 0
+    assert scan.overhead_h() == 0  # heat-up is not added on top of the total
+
+
+def test_signature_must_be_in_the_sniffed_head(tmp_path):
+    filler = ['; ' + 'x' * 98] * (SNIFF_SIZE // 100 + 1)
+    path = write(tmp_path, filler + ['; generated by PrusaSlicer 2.7.1'],
+                 ['; estimated printing time (normal mode) = 1h 0m 0s', '; filament used [g] = 5.0'])
+    meta = read_metadata(path)
+    assert meta.slicer == 'Unbekannt'
+    assert meta.print_time_h == pytest.approx(1.0)
+
+
+def test_first_registered_signature_wins():
+    # Orca files mention BambuStudio compatibility in their config block
+    assert sniff_parser('; generated by OrcaSlicer\n; BambuStudio 1.9').name == 'OrcaSlicer'
+
+
+@pytest.mark.parametrize('text, hours', [('1d 2h', 26), ('45m 10s', 45 / 60 + 10 / 3600), ('', None)])
+def test_parse_duration(text, hours):
+    assert parse_duration(text) == (None if hours is None else pytest.approx(hours))
@@ -0,0 +1,91 @@
+import os
+import sys
+
+import pytest
+
+from slicer_scan import ScanRoot, scan_for_gcode
+
+
+def make_file(path, mtime):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text('G1 X1\n', encoding='ascii')
+    os.utime(path, (mtime, mtime))
+    return str(path)
+
+
+@pytest.fixture
+def tree(tmp_path):
+    a, b = tmp_path / 'a', tmp_path / 'b'
+    files = {
+        'top': make_file(a / 'top.gcode', 1000),
+        'deep': make_file(a / 'one' / 'two' / 'deep.gcode', 3000),
+        'cache': make_file(a / 'cache' / 'cached.gcode', 9000),
+        'upper': make_file(a / 'one' / 'UPPER.GCODE', 1500),
+        'other': make_file(b / 'other.gcode', 2000),
+        'text': make_file(b / 'notes.txt', 9500),
+        'log': make_file(b / 'print.log.gcode', 9900),
+    }
+    return a, b, files
+
+
+def found(result):
+    return sorted(path for _, path in result.files)
+
+
+def test_newest_across_roots(tree):
+    a, b, files = tree
+    result = scan_for_gcode([ScanRoot(str(a), exclude=['cache']), ScanRoot(str(b), exclude=['*.log.*'])])
+    assert result.newest == files['deep']
+    assert found(result) == sorted([files['top'], files['deep'], files['upper'], files['other']])
+    assert not result.truncated
+
+
+def test_max_depth(tree):
+    a, _, files = tree
+    assert found(scan_for_gcode([ScanRoot(str(a), max_depth=0)])) == [files['top']]
+    shallow = scan_for_gcode([ScanRoot(str(a), max_depth=1, exclude=['cache'])])
+    assert found(shallow) == sorted([files['top'], files['upper']])
+
+
+def test_missing_and_duplicate_roots(tree, tmp_path):
+    a, _, _ = tree
+    result = scan_for_gcode([ScanRoot(str(a)), ScanRoot(str(a) + os.sep),
+                             ScanRoot(str(tmp_path / 'missing'))])
+    assert result.dirs_scanned == 4
+    assert len(result.files) == 4
+
+
+@pytest.mark.skipif(sys.platform == 'win32' or os.geteuid() == 0,
+                    reason='needs POSIX permissions and a non-root user')
+def test_unreadable_directory_is_skipped(tree):
+    a, _, files = tree
+    locked = a / 'one'
+    os.chmod(locked, 0)
+    try:
+        result = scan_for_gcode([ScanRoot(str(a))])
+    finally:
+        os.chmod(locked, 0o755)
+    assert found(result) == sorted([files['top'], files['cache']])
+
+
+def test_unreadable_directory_with_mocked_scandir(tree, monkeypatch):
+    a, _, files = tree
+    real_scandir = os.scandir
+
+    def scandir(path):
+        if os.path.basename(path) == 'one':
+            raise PermissionError(path)
+        return real_scandir(path)
+
+    monkeypatch.setattr(os, 'scandir', scandir)
+    result = scan_for_gcode([ScanRoot(str(a))])
+    assert found(result) == sorted([files['top'], files['cache']])
+    assert not result.truncated
+
+
+def test_zero_time_budget_stops_at_once(tree):
+    a, b, _ = tree
+    result = scan_for_gcode([ScanRoot(str(a)), ScanRoot(str(b))], time_budget=0)
+    assert result.truncated
+    assert result.files == []
+    assert result.dirs_scanned == 0
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from sweep import grid_sweep, monte_carlo, percentile_table, quote_arrays
+
+BASE = {'print_time': 2.0, 'filament_weight': 100.0, 'power_price': 0.3, 'filament_price': 25.0,
+        'quantity': 1, 'profit_margin': 20.0, 'power_consumption': 150.0}
+
+
+def test_grid_matches_scalar_formula():
+    results = grid_sweep({'power_price': [0.2, 0.3], 'profit_margin': [0, 20, 40]}, BASE)
+    assert len(results['total_price']) == 6
+    expected = quote_arrays(**dict(BASE, power_price=0.3, profit_margin=20))['total_price']
+    assert results['total_price'][4] == pytest.approx(float(expected))
+
+
+def test_monte_carlo_does_not_depend_on_batch_size():
+    distributions = {'power_price': ('normal', 0.3, 0.03),
+                     'filament_price': ('uniform', 20, 30),
+                     'failure_rate': ('triangular', 0, 0.05, 0.1),
+                     'print_time': ('lognormal', 2.0, 0.1)}
+    first = monte_carlo(distributions, BASE, samples=10_000, batch_size=3_000, seed=1)
+    second = monte_carlo(distributions, BASE, samples=10_000, seed=1)
+    assert np.array_equal(first['total_price'], second['total_price'])
+    assert len(percentile_table(first)['total_price']) == 5
+
+    other = monte_carlo(distributions, BASE, samples=10_000, seed=2)
+    assert not np.array_equal(first['total_price'], other['total_price'])
+
+
+@pytest.mark.parametrize('samples', [0, -5])
+def test_monte_carlo_needs_samples(samples):
+    with pytest.raises(ValueError):
+        monte_carlo({}, BASE, samples=samples)
+
+
+def test_grid_needs_values():
+    with pytest.raises(ValueError):
+        grid_sweep({'profit_margin': []}, BASE)
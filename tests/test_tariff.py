@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from tariff import TimeOfUseTariff, hourly_tariff, load_tariff
+
+START = datetime(2026, 3, 1, 0, 0)
+PRICES = [0.30, 0.30, 0.12, 0.45, 0.20, 0.20, 0.35, 0.10]
+
+
+@pytest.fixture
+def tariff():
+    return hourly_tariff(START, PRICES)
+
+
+def brute_force(start, hours, watts, step_s=1.0):
+    """Sum the price second by second"""
+    total = 0.0
+    t = (start - START).total_seconds()
+    end = t + hours * 3600
+    while t < end - 1e-9:
+        dt = min(step_s, end - t)
+        total += PRICES[int(t // 3600)] * watts / 1000 * dt / 3600
+        t += dt
+    return total
+
+
+@pytest.mark.parametrize('offset_min, hours', [(0, 1), (30, 1), (45, 2.5), (90, 0.25), (10, 7.5)])
+def test_energy_cost_across_zones(tariff, offset_min, hours):
+    start = START + timedelta(minutes=offset_min)
+    assert tariff.energy_cost(start, hours, 250) == pytest.approx(brute_force(start, hours, 250))
+
+
+def test_cheapest_start(tariff):
+    best, cost = tariff.cheapest_start(1, 1000)
+    assert best == START + timedelta(hours=7)
+    assert cost == pytest.approx(0.10)
+
+    # Window ends between breakpoints: the cheap hour at 02:00 lies inside it
+    best, cost = tariff.cheapest_start(1, 1000, earliest=START + timedelta(minutes=90),
+                                       latest=START + timedelta(minutes=150))
+    assert best == START + timedelta(hours=2)
+    assert cost == pytest.approx(tariff.energy_cost(best, 1, 1000))
+    candidates = [START + timedelta(minutes=m) for m in range(90, 151)]
+    assert cost == pytest.approx(min(tariff.energy_cost(s, 1, 1000) for s in candidates))
+
+    # No breakpoint inside: one of the window ends
+    best, _ = tariff.cheapest_start(2, 1000, earliest=START + timedelta(minutes=20),
+                                    latest=START + timedelta(minutes=40))
+    assert best == START + timedelta(minutes=40)
+
+
+def test_outside_the_tariff(tariff):
+    with pytest.raises(ValueError):
+        tariff.energy_cost(START - timedelta(minutes=1), 1, 100)
+    with pytest.raises(ValueError):
+        tariff.energy_cost(START + timedelta(hours=7, minutes=30), 1, 100)
+    with pytest.raises(ValueError):
+        tariff.price_at(START + timedelta(hours=8))
+    with pytest.raises(ValueError):
+        tariff.cheapest_start(9, 100)
+
+
+def test_gaps_are_rejected():
+    with pytest.raises(ValueError):
+        TimeOfUseTariff([(0, 3600, 0.3), (7200, 10800, 0.2)])
+
+
+def test_load_csv_without_end_column(tmp_path):
+    path = tmp_path / 'tariff.csv'
+    path.write_text('start,price,end\n2026-03-01T00:00,0.3,\n2026-03-01T06:00,0.2,2026-03-01T12:00\n',
+                    encoding='utf-8')
+    tariff = load_tariff(str(path))
+    assert tariff.average_price(START + timedelta(hours=5), 2) == pytest.approx(0.25)
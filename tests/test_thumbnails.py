@@ -0,0 +1,126 @@
+import base64
+import os
+
+import thumbnails
+from thumbnails import ThumbnailCache, locate_thumbnails, pick_block, read_thumbnail
+
+
+def thumbnail_lines(data, width, height, tag='thumbnail'):
+    encoded = base64.b64encode(data).decode('ascii')
+    lines = [f'; {tag} begin {width}x{height} {len(encoded)}']
+    lines += ['; ' + encoded[i:i + 78] for i in range(0, len(encoded), 78)]
+    lines.append(f'; {tag} end')
+    return lines
+
+
+def write_gcode(path, header, body_lines=10):
+    lines = ['; generated by PrusaSlicer 2.7.1'] + header + ['G28'] + ['G1 X1 Y1 E1'] * body_lines
+    path.write_text('\n'.join(lines) + '\n', encoding='ascii')
+    return str(path)
+
+
+def set_mtime(path, mtime):
+    os.utime(path, (mtime, mtime))
+
+
+def test_locate_and_pick(tmp_path):
+    small, large = b'\x89PNG small' * 3, b'\x89PNG large' * 40
+    path = write_gcode(tmp_path / 'a.gcode', thumbnail_lines(small, 16, 16)
+                       + thumbnail_lines(large, 300, 300)
+                       + thumbnail_lines(b'qoi', 300, 300, tag='thumbnail_QOI'))
+    blocks = locate_thumbnails(path)
+    assert [(b.width, b.format) for b in blocks] == [(16, 'PNG'), (300, 'PNG'), (300, 'QOI')]
+    assert read_thumbnail(path, pick_block(blocks)) == large
+    assert read_thumbnail(path, pick_block(blocks, max_size=(64, 64))) == small
+    assert read_thumbnail(path, pick_block(blocks, max_size=(8, 8))) == small
+    assert read_thumbnail(path, pick_block(blocks, fmt='QOI')) == b'qoi'
+
+
+def test_no_thumbnail_stops_at_the_first_command(tmp_path, monkeypatch):
+    path = write_gcode(tmp_path / 'plain.gcode', ['; just a comment'], body_lines=200_000)
+    read = []
+
+    class CountingFile:
+        def __init__(self, *args, **kwargs):
+            self.f = open(*args, **kwargs)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            self.f.close()
+
+        def __iter__(self):
+            for line in self.f:
+                read.append(line)
+                yield line
+
+    monkeypatch.setattr(thumbnails, 'open', CountingFile, raising=False)
+    assert locate_thumbnails(path) == []
+    assert len(read) == 3  # two comments and the first command
+    assert ThumbnailCache(str(tmp_path / 'cache')).get(path) is None
+
+
+def test_header_limit(tmp_path):
+    path = write_gcode(tmp_path / 'late.gcode', ['; filler'] * 100 + thumbnail_lines(b'png', 8, 8))
+    assert locate_thumbnails(path, limit=500) == []
+    assert len(locate_thumbnails(path)) == 1
+
+
+def test_key_follows_size_and_mtime(tmp_path):
+    path = tmp_path / 'a.gcode'
+    write_gcode(path, thumbnail_lines(b'one', 8, 8))
+    set_mtime(path, 1000)
+    first = ThumbnailCache.key(str(path))
+
+    set_mtime(path, 2000)
+    touched = ThumbnailCache.key(str(path))
+    assert touched != first
+
+    write_gcode(path, thumbnail_lines(b'two!', 8, 8))
+    set_mtime(path, 2000)
+    assert ThumbnailCache.key(str(path)) != touched
+    assert ThumbnailCache.key(str(path), (64, 64)) != ThumbnailCache.key(str(path))
+
+
+def test_edited_file_is_decoded_again(tmp_path):
+    path = tmp_path / 'a.gcode'
+    cache = ThumbnailCache(str(tmp_path / 'cache'))
+    write_gcode(path, thumbnail_lines(b'first', 8, 8))
+    set_mtime(path, 1000)
+    assert cache.get(str(path)) == b'first'
+
+    write_gcode(path, thumbnail_lines(b'second', 8, 8))
+    set_mtime(path, 2000)
+    assert cache.get(str(path)) == b'second'
+
+    # Same mtime but a different size: the disk cache entry no longer matches
+    write_gcode(path, [])
+    set_mtime(path, 2000)
+    assert ThumbnailCache(str(tmp_path / 'cache')).get(str(path)) is None
+
+
+def test_disk_cache_is_trimmed(tmp_path):
+    directory = tmp_path / 'cache'
+    cache = ThumbnailCache(str(directory), max_entries=2, max_disk_bytes=2500)
+    paths = []
+    for i in range(6):
+        path = write_gcode(tmp_path / f'{i}.gcode', thumbnail_lines(bytes([i]) * 1000, 8, 8))
+        paths.append(path)
+        assert cache.get(path) == bytes([i]) * 1000
+        for j, cached in enumerate(sorted(directory.iterdir(), key=os.path.getmtime)):
+            set_mtime(cached, 1000 + j)  # keep the LRU order stable on coarse clocks
+
+    files = list(directory.iterdir())
+    assert sum(f.stat().st_size for f in files) <= 2500
+    assert len(files) == 2
+    newest = os.path.join(str(directory), ThumbnailCache.key(paths[-1]) + '.png')
+    assert os.path.exists(newest)
+
+
+def test_single_entry_larger_than_the_limit_is_kept(tmp_path):
+    cache = ThumbnailCache(str(tmp_path / 'cache'), max_disk_bytes=10)
+    path = write_gcode(tmp_path / 'a.gcode', thumbnail_lines(b'x' * 100, 8, 8))
+    assert cache.get(path) == b'x' * 100
+    assert len(list((tmp_path / 'cache').iterdir())) == 1
+
@@ -0,0 +1,148 @@
+import base64
+import hashlib
+import os
+import re
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+HEADER_LIMIT = 1024 * 1024  # thumbnails sit in the header, never look further
+CACHE_DIRECTORY = '.thumbnail_cache'
+
+_BEGIN = re.compile(rb'^;\s*thumbnail(?:_(\w+))? begin (\d+)x(\d+) (\d+)', re.IGNORECASE)
+_END = re.compile(rb'^;\s*thumbnail(?:_\w+)? end', re.IGNORECASE)
+
+
+class ThumbnailBlock:
+    """Position of one embedded thumbnail; the payload is only read on demand"""
+
+    def __init__(self, offset: int, width: int, height: int, length: int, fmt: str = 'PNG'):
+        self.offset = offset  # first byte of the base64 lines
+        self.width = width
+        self.height = height
+        self.length = length  # base64 characters as declared by the slicer
+        self.format = fmt
+
+
+def locate_thumbnails(path: str, limit: int = HEADER_LIMIT) -> List[ThumbnailBlock]:
+    """Find the thumbnail blocks of a G-code file by reading its header only.
+
+    Reading stops at the first G/M command, since slicers write
+    thumbnails before any machine code.
+    """
+    blocks = []
+    offset = 0
+    with open(path, 'rb') as f:
+        for line in f:
+            offset += len(line)
+            if offset > limit or line[:1] in (b'G', b'M'):
+                break
+            found = _BEGIN.match(line)
+            if found:
+                fmt, width, height, length = found.groups()
+                blocks.append(ThumbnailBlock(offset, int(width), int(height), int(length),
+                                             (fmt or b'PNG').decode().upper()))
+    return blocks
+
+
+def read_thumbnail(path: str, block: ThumbnailBlock) -> bytes:
+    """Decode one thumbnail block into image bytes"""
+    parts = []
+    with open(path, 'rb') as f:
+        f.seek(block.offset)
+        for line in f:
+            if _END.match(line):
+                break
+            parts.append(line.lstrip(b';').strip())
+    return base64.b64decode(b''.join(parts))
+
+
+def pick_block(blocks: List[ThumbnailBlock], max_size: Optional[Tuple[int, int]] = None,
+               fmt: str = 'PNG') -> Optional[ThumbnailBlock]:
+    """Largest thumbnail of the format that fits into max_size, else the smallest one"""
+    candidates = [block for block in blocks if block.format == fmt]
+    if not candidates:
+        return None
+    if max_size:
+        fitting = [block for block in candidates
+                   if block.width <= max_size[0] and block.height <= max_size[1]]
+        if not fitting:
+            return min(candidates, key=lambda block: block.width * block.height)
+        candidates = fitting
+    return max(candidates, key=lambda block: block.width * block.height)
+
+
+class ThumbnailCache:
+    """Decoded thumbnails, kept in memory (LRU) and on disk.
+
+    Entries are keyed by the file's path, size and mtime, so an edited or
+    replaced file is decoded again. The disk cache is trimmed to
+    max_disk_bytes, oldest files first.
+    """
+
+    def __init__(self, directory: str = CACHE_DIRECTORY, max_entries: int = 32,
+                 max_disk_bytes: int = 20 * 1024 * 1024):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: 'OrderedDict[str, Optional[bytes]]' = OrderedDict()
+
+    @staticmethod
+    def key(path: str, max_size: Optional[Tuple[int, int]] = None) -> str:
+        st = os.stat(path)
+        identity = f"{os.path.realpath(path)}|{st.st_size}|{st.st_mtime_ns}|{max_size}"
+        return hashlib.sha1(identity.encode('utf-8')).hexdigest()
+
+    def get(self, path: str, max_size: Optional[Tuple[int, int]] = None) -> Optional[bytes]:
+        """PNG bytes of the file's thumbnail, or None if it has none"""
+        key = self.key(path, max_size)
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return self._memory[key]
+
+        cache_file = os.path.join(self.directory, key + '.png')
+        try:
+            with open(cache_file, 'rb') as f:
+                data = f.read()
+            os.utime(cache_file)  # mark as recently used for trimming
+        except OSError:
+            block = pick_block(locate_thumbnails(path), max_size)
+            data = read_thumbnail(path, block) if block else None
+            if data:
+                self._store(cache_file, data)
+
+        self._memory[key] = data
+        if len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+        return data
+
+    def _store(self, cache_file: str, data: bytes):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = cache_file + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, cache_file)
+            self.trim(keep=cache_file)
+        except OSError:
+            pass  # caching is best effort
+
+    def trim(self, keep: Optional[str] = None):
+        """Delete the least recently used files until the cache fits max_disk_bytes"""
+        with os.scandir(self.directory) as it:
+            entries = [(entry.stat().st_mtime, entry.stat().st_size, entry.path)
+                       for entry in it if entry.name.endswith('.png')]
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            if path == keep:
+                continue
+            os.remove(path)
+            total -= size
+
+    def clear(self):
+        self._memory.clear()
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith('.png'):
+                    os.remove(os.path.join(self.directory, name))